@@ -3,9 +3,17 @@ import os
 import json
 import time
 import subprocess
+import threading
+import requests
 from abc import ABC, abstractmethod
 
+OLLAMA_URL = "http://127.0.0.1:11434"
+
 class BaseAgent(ABC):
+    # HTTP session shared by all agents so Ollama requests reuse pooled connections
+    _http_session = None
+    _http_session_lock = threading.Lock()
+    
     def __init__(self, system_manager, memory_manager, model_name):
         self.logger = logging.getLogger(f"agent.{self.__class__.__name__}")
         self.system_manager = system_manager
@@ -31,6 +39,28 @@ class BaseAgent(ABC):
         """Main execution method to be implemented by each agent"""
         pass
     
+    @classmethod
+    def get_http_session(cls):
+        """Return the keep-alive HTTP session shared by all agents"""
+        if BaseAgent._http_session is None:
+            with BaseAgent._http_session_lock:
+                if BaseAgent._http_session is None:
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                    session.mount("http://", adapter)
+                    BaseAgent._http_session = session
+        return BaseAgent._http_session
+    
+    def _list_ollama_models(self, timeout=10):
+        """Return the names of the models available in Ollama"""
+        response = self.get_http_session().get(f"{OLLAMA_URL}/api/tags", timeout=timeout)
+        response.raise_for_status()
+        return {m.get("name") for m in response.json().get("models", [])}
+    
+    def _model_in(self, available_models):
+        """Check if this agent's model is among the available model names"""
+        return self.model_name in available_models or f"{self.model_name}:latest" in available_models
+    
     def get_status(self):
         """Get the current status of this agent"""
         return {
@@ -65,15 +95,9 @@ class BaseAgent(ABC):
         while retry_count <= max_retries:
             try:
                 # First check if the model exists
-                model_check = subprocess.run(
-                    ["ollama", "list"], 
-                    capture_output=True, 
-                    text=True,
-                    check=False,
-                    timeout=10  # 10 second timeout for model list
-                )
+                available_models = self._list_ollama_models(timeout=10)  # 10 second timeout for model list
                 
-                if self.model_name not in model_check.stdout:
+                if not self._model_in(available_models):
                     self.logger.error(f"Model {self.model_name} is not available in Ollama")
                     
                     # Try to download the model if it doesn't exist
@@ -104,7 +128,7 @@ class BaseAgent(ABC):
                     else:
                         self.model_failure_count += 1
                         
-                        error_msg = f"Model {self.model_name} is not available in Ollama. Available models: {model_check.stdout}"
+                        error_msg = f"Model {self.model_name} is not available in Ollama. Available models: {', '.join(sorted(available_models))}"
                         
                         # Call the callback with error info
                         if self.on_llm_response:
@@ -123,9 +147,7 @@ class BaseAgent(ABC):
                         retry_delay *= 2  # Exponential backoff
                         continue
                 
-                # Prepare command and modify prompt with system prompt if provided
-                cmd = ["ollama", "run", self.model_name]
-                
+                # Modify prompt with system prompt if provided
                 if system_prompt:
                     # Format the prompt with the appropriate system prompt template
                     # Qwen models use a different format than other models
@@ -136,16 +158,14 @@ class BaseAgent(ABC):
                         prompt = f"System: {system_prompt}\n\nUser: {prompt}\n\nAssistant:"
                 
                 # Set a timeout to prevent hanging
-                result = subprocess.run(
-                    cmd, 
-                    input=prompt, 
-                    capture_output=True, 
-                    text=True,
-                    check=True,
+                result = self.get_http_session().post(
+                    f"{OLLAMA_URL}/api/generate",
+                    json={"model": self.model_name, "prompt": prompt, "stream": False},
                     timeout=45  # 45 second timeout
                 )
+                result.raise_for_status()
                 
-                response = result.stdout.strip()
+                response = result.json().get("response", "").strip()
                 self.logger.debug(f"Model response: {response[:100]}...")
                 
                 # Reset failure count on success
@@ -169,7 +189,7 @@ class BaseAgent(ABC):
                 
                 return response
                 
-            except subprocess.TimeoutExpired:
+            except requests.Timeout:
                 self.logger.error(f"Timeout while querying model {self.model_name}")
                 self.model_failure_count += 1
                 
@@ -191,41 +211,44 @@ class BaseAgent(ABC):
                 time.sleep(retry_delay)
                 retry_delay *= 2  # Exponential backoff
                 
-            except subprocess.CalledProcessError as e:
+            except requests.ConnectionError as e:
                 self.logger.error(f"Error querying model: {e}")
-                self.logger.error(f"Stderr: {e.stderr}")
                 self.model_failure_count += 1
                 
-                # Check if it's a connection issue that might be temporary
-                if "connection refused" in e.stderr.lower() or "no route to host" in e.stderr.lower():
-                    self.logger.warning("Connection issue detected, might be temporary")
-                    # If we've exhausted retries, return the error
-                    if retry_count >= max_retries:
-                        error_msg = f"Connection error: {e.stderr}"
-                        
-                        # Call the callback with error info
-                        if self.on_llm_response:
-                            try:
-                                self.on_llm_response(self.name, prompt, f"Error: {error_msg}")
-                            except Exception as callback_error:
-                                self.logger.error(f"Error in LLM response callback: {str(callback_error)}")
-                                
-                        return f"Error: {error_msg}"
+                # Connection issues (e.g. Ollama restarting) might be temporary
+                self.logger.warning("Connection issue detected, might be temporary")
+                # If we've exhausted retries, return the error
+                if retry_count >= max_retries:
+                    error_msg = f"Connection error: {str(e)}"
                     
-                    # Otherwise, increment retry count and try again after delay
-                    retry_count += 1
-                    time.sleep(retry_delay)
-                    retry_delay *= 2  # Exponential backoff
-                    continue
+                    # Call the callback with error info
+                    if self.on_llm_response:
+                        try:
+                            self.on_llm_response(self.name, prompt, f"Error: {error_msg}")
+                        except Exception as callback_error:
+                            self.logger.error(f"Error in LLM response callback: {str(callback_error)}")
+                            
+                    return f"Error: {error_msg}"
+                
+                # Otherwise, increment retry count and try again after delay
+                retry_count += 1
+                time.sleep(retry_delay)
+                retry_delay *= 2  # Exponential backoff
+                
+            except requests.HTTPError as e:
+                error_text = e.response.text if e.response is not None else str(e)
+                self.logger.error(f"Error querying model: {e}")
+                self.logger.error(f"Response: {error_text}")
+                self.model_failure_count += 1
                 
                 # Call the callback with error info
                 if self.on_llm_response:
                     try:
-                        self.on_llm_response(self.name, prompt, f"Error: {e.stderr}")
+                        self.on_llm_response(self.name, prompt, f"Error: {error_text}")
                     except Exception as callback_error:
                         self.logger.error(f"Error in LLM response callback: {str(callback_error)}")
                         
-                return f"Error: {e.stderr}"
+                return f"Error: {error_text}"
                 
             except Exception as e:
                 self.logger.error(f"Unexpected error querying model: {str(e)}")
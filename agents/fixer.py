@@ -98,6 +98,43 @@ class Fixer(BaseAgent):
         self.logger.info(f"Attempted {len(fixes)} fixes. Successful: {sum(1 for f in fixes if f.get('success', False))}")
         return fixes
     
+    def apply_cached_fixes(self, cached):
+        """Re-apply previously successful fixes to (result, fix) pairs without calling the LLM
+        
+        Each fix is still verified by running the fixed test; returns one fix result per pair
+        (None where the original test could not be found).
+        """
+        fix_results = []
+        for result, fix in cached:
+            test_id = result.get("test_id")
+            test = self._get_test_by_id(test_id)
+            if not test:
+                self.logger.warning(f"Could not find original test for ID: {test_id}")
+                fix_results.append(None)
+                continue
+                
+            fix_result = self._apply_fix(test, result, fix)
+            self.fixes_attempted += 1
+            if fix_result.get("success", False):
+                self.fixes_successful += 1
+                self.tests_fixed_successfully += 1
+                self.logger.info(f"Successfully fixed test {test_id} using cached fix")
+                
+                # Emit the test fixed update signal
+                self.system_manager.test_fixed_update.emit({
+                    "test_id": test_id,
+                    "test_name": test.get("name", f"Test {test_id}"),
+                    "test_type": test.get("type", "unknown"),
+                    "failure_reason": result.get("failure_reason", "Unknown failure"),
+                    "fix_type": "cached_fix",
+                    "timestamp": time.time()
+                })
+            fix_results.append(fix_result)
+        
+        if fix_results:
+            self._update_fix_knowledge()
+        return fix_results
+    
     def _fix_single_issue(self, test, result, strategy=0):
         """Attempt to fix a single test failure using a specific strategy
         
@@ -977,6 +1014,7 @@ class Fixer(BaseAgent):
                         "test_id": test_id,
                         "success": success,
                         "fix_type": fix_type,
+                        "fixed_code": fixed_code,
                         "analysis": fix.get("analysis", ""),
                         "explanation": fix.get("explanation", ""),
                         "output": str(output),
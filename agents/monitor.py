@@ -3,10 +3,19 @@ import json
 import time
 import os
 import psutil
+import numpy as np
+import requests
 import threading
 from datetime import datetime, timedelta
 from agents.base_agent import BaseAgent
 import subprocess
+import sys
+
+# Shared severity levels for health issues
+SEV_CRITICAL = sys.intern("critical")
+SEV_HIGH = sys.intern("high")
+SEV_MEDIUM = sys.intern("medium")
+SEV_LOW = sys.intern("low")
 
 class Monitor(BaseAgent):
     def __init__(self, system_manager, memory_manager, model_name):
@@ -46,6 +55,14 @@ class Monitor(BaseAgent):
         self.monitoring_thread = None
         self.monitoring_interval = 60  # seconds
         self.monitoring_active = False
+        self._monitoring_stop = threading.Event()
+        
+        # Write-behind buffer for knowledge updates, drained by the background loop
+        self._pending_writes = {}
+        self._pending_lock = threading.Lock()
+        
+        # Cached Ollama PID so liveness checks don't rescan the process table
+        self._ollama_pid = None
         
     def initialize(self):
         """Initialize the monitor agent"""
@@ -74,6 +91,11 @@ class Monitor(BaseAgent):
         
         issues = []
         
+        # Check circuit breakers first
+        circuit_issues = self._check_circuit_breakers()
+        issues.extend(circuit_issues)
+        system_stalled = any(i.get("severity") == SEV_CRITICAL for i in circuit_issues)
+        
         # Check system resources
         resource_issues = self._check_system_resources()
         issues.extend(resource_issues)
@@ -82,21 +104,20 @@ class Monitor(BaseAgent):
         memory_issues = self._check_memory_status()
         issues.extend(memory_issues)
         
-        # Check agent statuses
-        agent_issues = self._check_agent_statuses()
-        issues.extend(agent_issues)
-        
-        # Check circuit breakers
-        circuit_issues = self._check_circuit_breakers()
-        issues.extend(circuit_issues)
-        
-        # Check for error patterns
-        error_issues = self._check_error_patterns()
-        issues.extend(error_issues)
-        
-        # Check model availability
-        model_issues = self._check_model_availability()
-        issues.extend(model_issues)
+        # When every breaker is tripped the agent, error and model checks would
+        # only add noise (and the slowest calls) to an already stalled system
+        if not system_stalled:
+            # Check agent statuses
+            agent_issues = self._check_agent_statuses()
+            issues.extend(agent_issues)
+            
+            # Check for error patterns
+            error_issues = self._check_error_patterns()
+            issues.extend(error_issues)
+            
+            # Check model availability
+            model_issues = self._check_model_availability()
+            issues.extend(model_issues)
         
         # Update stats
         self.health_checks += 1
@@ -110,20 +131,26 @@ class Monitor(BaseAgent):
                 message = issue.get('message', 'Unknown issue')
                 self.logger.warning(f"Health alert: {message} (Severity: {severity})")
                 
-        # Save the health check results
-        self.memory.save_knowledge("health_checks", {
-            "timestamp": time.time(),
-            "check_count": self.health_checks,
-            "alert_count": self.health_alerts,
-            "issues": issues
-        })
-        
-        # Update monitor stats
-        self.memory.save_knowledge("monitor_stats", {
-            "health_checks": self.health_checks,
-            "health_alerts": self.health_alerts,
-            "last_check": time.time()
-        })
+        # Queue the health check results and monitor stats for the next flush
+        now = time.time()
+        with self._pending_lock:
+            self._pending_writes.update({
+                "health_checks": {
+                    "timestamp": now,
+                    "check_count": self.health_checks,
+                    "alert_count": self.health_alerts,
+                    "issues": issues
+                },
+                "monitor_stats": {
+                    "health_checks": self.health_checks,
+                    "health_alerts": self.health_alerts,
+                    "last_check": now
+                }
+            })
+            
+        # Without a background loop to drain the queue, write through
+        if not (self.monitoring_thread and self.monitoring_thread.is_alive()):
+            self._flush_pending_writes()
         
         self.logger.info(f"Health check completed. Healthy: {len(issues) == 0}, Issues: {len(issues)}")
         
@@ -143,7 +170,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "disk_usage",
                     "message": f"Disk usage is high: {disk_usage}%",
-                    "severity": "high" if disk_usage > 95 else "medium",
+                    "severity": SEV_HIGH if disk_usage > 95 else SEV_MEDIUM,
                     "details": {"usage_percent": disk_usage}
                 })
                 
@@ -153,7 +180,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "memory_usage",
                     "message": f"Memory usage is high: {memory_usage}%",
-                    "severity": "high" if memory_usage > 95 else "medium",
+                    "severity": SEV_HIGH if memory_usage > 95 else SEV_MEDIUM,
                     "details": {"usage_percent": memory_usage}
                 })
                 
@@ -163,7 +190,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "cpu_usage",
                     "message": f"CPU usage is high: {cpu_usage}%",
-                    "severity": "medium",
+                    "severity": SEV_MEDIUM,
                     "details": {"usage_percent": cpu_usage}
                 })
                 
@@ -172,7 +199,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "ollama_process",
                     "message": "Ollama process is not running",
-                    "severity": "high",
+                    "severity": SEV_HIGH,
                     "details": {"service": "ollama"}
                 })
         except Exception as e:
@@ -180,7 +207,7 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "resource_check_error",
                 "message": f"Error checking system resources: {str(e)}",
-                "severity": "medium",
+                "severity": SEV_MEDIUM,
                 "details": {"error": str(e)}
             })
             
@@ -197,7 +224,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "no_backups",
                     "message": "No memory backups found",
-                    "severity": "low",
+                    "severity": SEV_LOW,
                     "details": {"backup_dir": backup_dir}
                 })
                 
@@ -207,7 +234,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "limited_knowledge",
                     "message": f"Knowledge base has few items: {knowledge_items}",
-                    "severity": "low",
+                    "severity": SEV_LOW,
                     "details": {"item_count": knowledge_items}
                 })
         except Exception as e:
@@ -215,7 +242,7 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "memory_check_error",
                 "message": f"Error checking memory status: {str(e)}",
-                "severity": "low",
+                "severity": SEV_LOW,
                 "details": {"error": str(e)}
             })
             
@@ -236,7 +263,7 @@ class Monitor(BaseAgent):
                     issues.append({
                         "type": "agent_status",
                         "message": f"Agent {agent_name} has status: {agent_status}",
-                        "severity": "medium",
+                        "severity": SEV_MEDIUM,
                         "details": {"agent": agent_name, "status": agent_status}
                     })
                     
@@ -246,7 +273,7 @@ class Monitor(BaseAgent):
                     issues.append({
                         "type": "model_failures",
                         "message": f"Agent {agent_name} has {model_failures} model failures",
-                        "severity": "medium" if model_failures > 2 else "low",
+                        "severity": SEV_MEDIUM if model_failures > 2 else SEV_LOW,
                         "details": {"agent": agent_name, "failures": model_failures}
                     })
                     
@@ -256,7 +283,7 @@ class Monitor(BaseAgent):
                     issues.append({
                         "type": "stalled_agent",
                         "message": f"Agent {agent_name} has not acted in {int(last_action/60)} minutes",
-                        "severity": "high" if last_action > 600 else "medium",  # Higher severity if >10 min
+                        "severity": SEV_HIGH if last_action > 600 else SEV_MEDIUM,  # Higher severity if >10 min
                         "details": {"agent": agent_name, "last_action_seconds": last_action}
                     })
         except Exception as e:
@@ -264,7 +291,7 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "agent_check_error",
                 "message": f"Error checking agent statuses: {str(e)}",
-                "severity": "medium",
+                "severity": SEV_MEDIUM,
                 "details": {"error": str(e)}
             })
             
@@ -275,15 +302,19 @@ class Monitor(BaseAgent):
         issues = []
         
         try:
-            # Check which circuit breakers are tripped
-            tripped_breakers = []
-            for agent_name, tripped in self.system_manager.circuit_breakers.items():
-                if tripped:
+            # Check which circuit breakers are tripped (single pass, list only built on a trip)
+            tripped_count = 0
+            tripped_breakers = None
+            for agent_name, breaker in self.system_manager.breakers.items():
+                if breaker.open:
+                    tripped_count += 1
+                    if tripped_breakers is None:
+                        tripped_breakers = []
                     tripped_breakers.append(agent_name)
                     
-            if tripped_breakers:
+            if tripped_count:
                 # If multiple breakers are tripped, this is more severe
-                severity = "high" if len(tripped_breakers) > 1 else "medium"
+                severity = SEV_HIGH if tripped_count > 1 else SEV_MEDIUM
                 
                 issues.append({
                     "type": "circuit_breakers_tripped",
@@ -293,11 +324,11 @@ class Monitor(BaseAgent):
                 })
                 
             # Check if all circuit breakers are tripped
-            if len(tripped_breakers) == len(self.system_manager.agents):
+            if tripped_count and tripped_count == len(self.system_manager.agents):
                 issues.append({
                     "type": "all_circuit_breakers_tripped",
                     "message": "All circuit breakers are tripped, system is completely stalled",
-                    "severity": "critical",
+                    "severity": SEV_CRITICAL,
                     "details": {"agents": tripped_breakers}
                 })
         except Exception as e:
@@ -305,7 +336,7 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "circuit_breaker_check_error",
                 "message": f"Error checking circuit breakers: {str(e)}",
-                "severity": "medium",
+                "severity": SEV_MEDIUM,
                 "details": {"error": str(e)}
             })
             
@@ -321,24 +352,30 @@ class Monitor(BaseAgent):
             
             # Check for high-frequency errors
             high_frequency_errors = []
-            for error_type, error_data in error_history.items():
-                count = error_data.get('count', 0)
-                last_seen = error_data.get('last_seen', 0)
+            if error_history:
+                # Lay counts and timestamps out as arrays and filter with a boolean mask
+                error_types = list(error_history)
+                counts = np.fromiter((error_history[k].get('count', 0) for k in error_types),
+                                     dtype=np.int64, count=len(error_types))
+                last_seen = np.fromiter((error_history[k].get('last_seen', 0) for k in error_types),
+                                        dtype=np.float64, count=len(error_types))
                 current_time = time.time()
                 
-                # If error occurred many times recently
-                if count > 10 and (current_time - last_seen) < 3600:  # More than 10 times in last hour
+                # If error occurred many times recently (more than 10 times in last hour)
+                mask = (counts > 10) & ((current_time - last_seen) < 3600)
+                for i in np.flatnonzero(mask):
+                    error_type = error_types[i]
                     high_frequency_errors.append({
                         "type": error_type,
-                        "count": count,
-                        "details": error_data.get('details', '')[:100]
+                        "count": int(counts[i]),
+                        "details": error_history[error_type].get('details', '')[:100]
                     })
             
             if high_frequency_errors:
                 issues.append({
                     "type": "recurring_errors",
                     "message": f"Detected {len(high_frequency_errors)} types of recurring errors",
-                    "severity": "high" if len(high_frequency_errors) > 3 else "medium",
+                    "severity": SEV_HIGH if len(high_frequency_errors) > 3 else SEV_MEDIUM,
                     "details": {"errors": high_frequency_errors}
                 })
                 
@@ -354,7 +391,7 @@ class Monitor(BaseAgent):
                     issues.append({
                         "type": "system_exceptions",
                         "message": f"System experienced {count} exceptions, most recent: {system_exc_data.get('details', '')[:100]}",
-                        "severity": "high",
+                        "severity": SEV_HIGH,
                         "details": {"count": count, "last_seen": last_seen}
                     })
                     
@@ -364,7 +401,7 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "unfixable_tests",
                     "message": f"System has {unfixable_tests} tests that could not be fixed",
-                    "severity": "medium",
+                    "severity": SEV_MEDIUM,
                     "details": {"count": unfixable_tests}
                 })
         except Exception as e:
@@ -372,7 +409,7 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "error_pattern_check_error",
                 "message": f"Error checking error patterns: {str(e)}",
-                "severity": "low",
+                "severity": SEV_LOW,
                 "details": {"error": str(e)}
             })
             
@@ -385,17 +422,29 @@ class Monitor(BaseAgent):
         try:
             model_name = self.system_manager.model_name
             
-            # Check if Ollama is running first
+            # Ask the Ollama HTTP API first; it is far cheaper than exec'ing the CLI
+            available_models = self._list_models_http()
+            if available_models is not None:
+                if not self._model_in(available_models):
+                    issues.append({
+                        "type": "model_not_available",
+                        "message": f"Model {model_name} is not available in Ollama",
+                        "severity": SEV_HIGH,
+                        "details": {"model": model_name, "available_models": "\n".join(sorted(available_models))}
+                    })
+                return issues
+            
+            # API unreachable - check if Ollama is running at all
             if not self._is_ollama_running():
                 issues.append({
                     "type": "ollama_not_running",
                     "message": "Ollama service is not running",
-                    "severity": "critical",
+                    "severity": SEV_CRITICAL,
                     "details": {"model": model_name}
                 })
                 return issues
                 
-            # Check if the model is available
+            # Fall back to the CLI to check if the model is available
             result = subprocess.run(
                 ["ollama", "list"], 
                 capture_output=True, 
@@ -408,14 +457,14 @@ class Monitor(BaseAgent):
                 issues.append({
                     "type": "model_not_available",
                     "message": f"Model {model_name} is not available in Ollama",
-                    "severity": "high",
+                    "severity": SEV_HIGH,
                     "details": {"model": model_name, "available_models": result.stdout}
                 })
         except subprocess.TimeoutExpired:
             issues.append({
                 "type": "ollama_timeout",
                 "message": "Timeout checking Ollama model availability",
-                "severity": "high",
+                "severity": SEV_HIGH,
                 "details": {"model": self.system_manager.model_name}
             })
         except Exception as e:
@@ -423,12 +472,20 @@ class Monitor(BaseAgent):
             issues.append({
                 "type": "model_check_error",
                 "message": f"Error checking model availability: {str(e)}",
-                "severity": "medium",
+                "severity": SEV_MEDIUM,
                 "details": {"error": str(e)}
             })
             
         return issues
     
+    def _list_models_http(self):
+        """Return the set of model names from the Ollama API, or None if it is unreachable"""
+        try:
+            return self._list_ollama_models(timeout=3)
+        except (requests.RequestException, ValueError) as e:
+            self.logger.debug(f"Ollama API unavailable: {str(e)}")
+            return None
+    
     def _get_disk_usage(self):
         """Get disk usage percentage"""
         try:
@@ -494,31 +551,50 @@ class Monitor(BaseAgent):
     
     def _is_ollama_running(self):
         """Check if the Ollama process is running"""
+        # Fast path: probe the cached PID with a no-op signal
+        # (on Windows signal 0 is CTRL_C_EVENT, so use psutil there)
+        pid = self._ollama_pid
+        if pid and os.name != 'posix':
+            if psutil.pid_exists(pid):
+                return True
+            self._ollama_pid = None
+        elif pid:
+            try:
+                os.kill(pid, 0)
+                return True
+            except ProcessLookupError:
+                self._ollama_pid = None
+            except PermissionError:
+                return True  # Process exists but belongs to another user
+            except OSError:
+                self._ollama_pid = None
+        
         try:
-            # Check for the ollama process
-            if os.name == 'posix':  # Linux/Unix
-                result = subprocess.run(['pgrep', 'ollama'], capture_output=True, text=True)
-                return result.returncode == 0
-                
-            # Try a basic connection test as fallback
-            result = subprocess.run(
-                ["ollama", "list"], 
-                capture_output=True,
-                text=True,
-                check=False,
-                timeout=5
-            )
-            return result.returncode == 0
+            # Rediscover the ollama process
+            for proc in psutil.process_iter(['name', 'pid']):
+                name = proc.info.get('name') or ''
+                if 'ollama' in name.lower():
+                    self._ollama_pid = proc.info['pid']
+                    return True
+            return False
         except Exception as e:
             self.logger.error(f"Error checking if Ollama is running: {str(e)}")
             return False
     
+    def _flush_pending_writes(self):
+        """Persist queued knowledge updates"""
+        with self._pending_lock:
+            pending, self._pending_writes = self._pending_writes, {}
+        for concept, data in pending.items():
+            self.memory.save_knowledge(concept, data)
+    
     def _start_background_monitoring(self):
         """Start background monitoring thread"""
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             return  # Already running
             
         self.monitoring_active = True
+        self._monitoring_stop.clear()
         self.monitoring_thread = threading.Thread(target=self._background_monitoring_loop)
         self.monitoring_thread.daemon = True
         self.monitoring_thread.start()
@@ -527,16 +603,22 @@ class Monitor(BaseAgent):
     def _stop_background_monitoring(self):
         """Stop the background monitoring thread"""
         self.monitoring_active = False
+        self._monitoring_stop.set()  # Wake the loop so it exits immediately
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=10.0)
             self.logger.info("Stopped background monitoring thread")
+        self._flush_pending_writes()
     
     def _background_monitoring_loop(self):
         """Background thread that periodically monitors system health"""
         while self.monitoring_active:
             try:
-                # Sleep for the monitoring interval
-                time.sleep(self.monitoring_interval)
+                # Wait for the monitoring interval (returns early on stop)
+                if self._monitoring_stop.wait(self.monitoring_interval):
+                    break
+                
+                # Drain any knowledge updates queued by health checks
+                self._flush_pending_writes()
                 
                 # Skip if the system is not running
                 if not self.system_manager.running:
@@ -546,7 +628,7 @@ class Monitor(BaseAgent):
                 system_health = self._check_system_health()
                 
                 # If there are high severity issues, run a full health check
-                high_severity_issues = [i for i in system_health.get("issues", []) if i.get("severity") == "high"]
+                high_severity_issues = [i for i in system_health.get("issues", []) if i.get("severity") == SEV_HIGH]
                 
                 if high_severity_issues:
                     self.logger.warning("Background monitor detected high severity issues, running full health check")
@@ -554,4 +636,4 @@ class Monitor(BaseAgent):
                     
             except Exception as e:
                 self.logger.error(f"Error in background monitoring: {str(e)}")
-                time.sleep(30)  # Sleep a bit longer if there was an error 
\ No newline at end of file
+                self._monitoring_stop.wait(30)  # Wait a bit longer if there was an error 
\ No newline at end of file
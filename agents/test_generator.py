@@ -1,16 +1,127 @@
 import logging
 import json
+import functools
+import re
 import random
+import math
 import time
+import copy
+import hashlib
+import heapq
+import threading
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 from agents.base_agent import BaseAgent
+from utils import json_utils
+
+_JSON_DECODER = json.JSONDecoder()
+
+@functools.lru_cache(maxsize=1024)
+def _syntax_error(code):
+    """Return the SyntaxError message from compiling code, or None if it compiles"""
+    # A full compile, not just ast.parse: it also rejects a top-level return/break/await
+    # and misplaced global/nonlocal, which parse fine
+    try:
+        compile(code, "<string>", "exec")
+    except SyntaxError as e:
+        return str(e)
+    return None
+
+_DEF_NO_COLON_RE = re.compile(r"^([ \t]*def [^:\n]*)$", re.M)
+_LINE_RE = re.compile(r"^.*$", re.M)
+
+def _close_line_quotes(match):
+    """Append a closing quote to a line with an odd number of quotes"""
+    line = match.group(0)
+    # Escaped quotes don't open or close a string, so leave them out of the parity count
+    scan = line
+    if "\\" in scan:
+        scan = scan.replace("\\\\", "").replace("\\'", "").replace('\\"', "")
+    if scan.count("'") % 2:
+        line += "'"
+    if scan.count('"') % 2:
+        line += '"'
+    return line
+
+def _fix_missing_colons(code):
+    return _DEF_NO_COLON_RE.sub(r"\1:", code)
+
+def _fix_unclosed_quotes(code):
+    return _LINE_RE.sub(_close_line_quotes, code)
+
+def _fix_unclosed_parens(code):
+    missing = code.count('(') - code.count(')')
+    return code + ')' * missing if missing > 0 else None
+
+# (error message matcher, fixer) pairs tried in order by _fix_syntax
+_SYNTAX_FIXERS = (
+    (lambda msg: "expected ':'" in msg, _fix_missing_colons),
+    (lambda msg: "EOL while scanning string literal" in msg or "unterminated string literal" in msg,
+     _fix_unclosed_quotes),
+    (lambda msg: ("unexpected EOF" in msg and "parenthesis" in msg) or "'(' was never closed" in msg,
+     _fix_unclosed_parens),
+)
 
 class TestGenerator(BaseAgent):
+    _SYSTEM_PROMPT = """
+        You are a test generator for a self-improving multi-agent system. 
+        Your task is to create challenging but fair tests that will help the system learn and improve.
+        Generate a single test case as a JSON object.
+        """
+    
+    _PROMPT_TEMPLATE = """
+        Please generate a {complexity} level {test_type} test for our self-improving agent system.
+        
+        The test should:
+        - Be appropriately challenging for the {complexity} complexity level
+        - Have clear success criteria
+        - Include necessary code or inputs
+        - Be self-contained and executable
+        
+        Previous tests the system has seen:
+        {previous_tests}
+        
+        Recent test results:
+        {previous_results}
+
+        Learned patterns to guide generation:
+        {learned_patterns}
+        
+        Return ONLY a JSON object with these fields:
+        {{
+            "name": "Name of the test",
+            "type": "{test_type}",
+            "complexity": "{complexity}",
+            "description": "Description of what the test evaluates",
+            "inputs": {{...}},
+            "code": "Code to execute (if needed)",
+            "success_criteria": "Clear conditions for passing",
+            "timeout_seconds": 30
+        }}
+        """
+    
+    # Static fields of the fallback test; parameter name in the code matches the input key
+    _FALLBACK_PROTO = MappingProxyType({
+        "description": "A basic test generated as fallback",
+        "inputs": {"value": 10},
+        "code": "def test_function(value):\n    return value * 2",
+        "success_criteria": "Result should be twice the input value",
+        "timeout_seconds": 30,
+        "generator_version": "1.0",
+        "is_fallback": True
+    })
+    
+    # Fields of previous tests worth showing the LLM; code and per-run
+    # timestamps/IDs are left out to keep the prompt small and stable
+    _TEST_SUMMARY_FIELDS = ("name", "type", "complexity", "success_criteria")
+    
     def __init__(self, system_manager, memory_manager, model_name):
         super().__init__(system_manager, memory_manager, model_name)
         
         # Test generation settings
         self.complexity_levels = ["beginner", "intermediate", "advanced", "expert"]
-        self.current_complexity = "beginner"
+        self._complexity_idx = 0  # Index into complexity_levels
         self.test_types = ["function", "integration", "system", "performance"]
         
         # Track performance for adaptive complexity
@@ -18,6 +129,28 @@ class TestGenerator(BaseAgent):
         self.tests_generated = 0
         self.learned_patterns = {}
         
+        # Pass/fail outcomes of the most recent test results
+        self._recent_outcomes = deque(maxlen=10)
+        
+        # Validation verdicts keyed by a hash of (code, inputs, success_criteria)
+        self._validation_cache = OrderedDict()
+        self._validation_cache_size = 1024
+        
+        # Serialized prompt context, rebuilt only when the source data changes
+        self._learned_patterns_json = "{}"
+        self._prompt_templates = {}
+        self._context_json_cache = {}  # (complexity, test_type) -> (history version, JSON blocks)
+        
+        # Max concurrent LLM requests when generating a batch
+        self.max_parallel_requests = 4
+        self.oversubscribe_factor = 1.3  # Extra requests per missing test in a wave
+        self.max_generation_waves = 3
+        
+        # LRU cache of parsed LLM responses keyed by prompt hash, as (last batch served, test)
+        self._response_cache = OrderedDict()
+        self._response_cache_size = 128
+        self._response_cache_lock = threading.Lock()
+        
     def initialize(self):
         """Initialize the test generator"""
         super().initialize()
@@ -25,17 +158,51 @@ class TestGenerator(BaseAgent):
         # Load previous tests to understand current complexity level
         test_history = self.memory.get_knowledge("test_generation_history")
         if test_history:
-            self.current_complexity = test_history.get("current_complexity", "beginner")
+            self._complexity_idx = self._load_complexity_index(test_history)
             self.success_rate = test_history.get("success_rate", 0.5)
             self.tests_generated = test_history.get("tests_generated", 0)
+            self._recent_outcomes.extend(test_history.get("recent_outcomes", []))
+            
+        # Seed the outcome window from stored results when none were persisted
+        if not self._recent_outcomes:
+            recent_results = self._get_recent_results(self._recent_outcomes.maxlen)
+            self._recent_outcomes.extend(bool(r.get("passed", False)) for r in reversed(recent_results))
+        self.memory.add_result_listener(self._on_test_result)
 
         learning_stats = self.memory.get_knowledge("learning_stats")
         if learning_stats:
             self.learned_patterns = learning_stats.get("patterns", {})
+        self._learned_patterns_json = json_utils.dumps(self.learned_patterns, indent=True)
+        
+        # Bake complexity and type into one prompt template per combination
+        self._prompt_templates = {
+            (complexity, test_type): self._specialize_prompt(complexity, test_type)
+            for complexity in self.complexity_levels
+            for test_type in self.test_types
+        }
             
         self.logger.info(f"Test generator initialized at complexity level: {self.current_complexity}")
         return True
     
+    @property
+    def current_complexity(self):
+        """Name of the current complexity level"""
+        return self.complexity_levels[self._complexity_idx]
+    
+    @current_complexity.setter
+    def current_complexity(self, level):
+        self._complexity_idx = self.complexity_levels.index(level)
+    
+    def _load_complexity_index(self, test_history):
+        """Read the stored complexity level, accepting the older string-only format"""
+        index = test_history.get("complexity_index")
+        if isinstance(index, int) and 0 <= index < len(self.complexity_levels):
+            return index
+        level = test_history.get("current_complexity", "beginner")
+        if level in self.complexity_levels:
+            return self.complexity_levels.index(level)
+        return 0
+    
     def execute(self, *args, **kwargs):
         """Execute the test generation process"""
         return self.generate_tests(*args, **kwargs)
@@ -52,94 +219,99 @@ class TestGenerator(BaseAgent):
         tests = []
         validation_failures = 0
         max_attempts = count * 3  # Try up to 3 times per test
+        batch_ts = time.time()  # Shared timestamp for all metadata in this batch
         attempt = 0
+        wave = 0
+        
+        # Shuffle a balanced sequence of test types once for the whole batch
+        test_types = random.sample(self.test_types * math.ceil(max_attempts / len(self.test_types)), max_attempts)
         
-        while len(tests) < count and attempt < max_attempts:
-            attempt += 1
-            self.logger.info(f"Generating test {len(tests)+1}/{count} (attempt {attempt})")
+        while len(tests) < count and attempt < max_attempts and wave < self.max_generation_waves:
+            # Back off before re-requesting a shortfall
+            if wave:
+                time.sleep(2 ** wave)
+            wave += 1
             
-            try:
-                # Generate a test
-                test = self._generate_single_test()
+            # Request every missing test at once, over-requesting a little so
+            # that a few invalid responses don't force another round-trip
+            deficit = count - len(tests)
+            wave_size = min(math.ceil(deficit * self.oversubscribe_factor), max_attempts - attempt)
+            wave_types = test_types[attempt:attempt + wave_size]
+            attempt += wave_size
+            self.logger.info(f"Generating {wave_size} test(s) concurrently for {deficit} needed (wave {wave})")
+            
+            pending = []
+            with ThreadPoolExecutor(max_workers=min(wave_size, self.max_parallel_requests)) as executor:
+                futures = [executor.submit(self._generate_single_test, test_type, batch_ts) for test_type in wave_types]
                 
-                if test:
-                    # Validate the test
-                    is_valid, validation_message = self._validate_test(test)
-                    
-                    if is_valid:
-                        # Save to database and get an ID
-                        test_id = self.memory.save_test(test)
-                        test["id"] = test_id
+                # Validate sequentially, in submission order
+                for future in futures:
+                    try:
+                        test = future.result()
                         
-                        # Add to the list of generated tests
-                        tests.append(test)
-                        self.tests_generated += 1
-                    else:
-                        self.logger.warning(f"Test validation failed: {validation_message}")
-                        validation_failures += 1
-                else:
-                    self.logger.warning("Failed to generate test")
-            except Exception as e:
-                self.logger.error(f"Error generating test: {str(e)}")
+                        if test:
+                            # Validate the test
+                            is_valid, validation_message = self._validate_test(test)
+                            
+                            if is_valid:
+                                pending.append(test)
+                            else:
+                                self.logger.warning(f"Test validation failed: {validation_message}")
+                                validation_failures += 1
+                        else:
+                            self.logger.warning("Failed to generate test")
+                    except Exception as e:
+                        self.logger.error(f"Error generating test: {str(e)}")
+                        
+            # Save the wave's valid tests in one write; this assigns their IDs
+            pending = pending[:deficit]
+            if pending:
+                self.memory.save_tests(pending)
+                tests.extend(pending)
+                self.tests_generated += len(pending)
                 
         # Update metrics
         if validation_failures > 0:
             self.logger.info(f"{validation_failures} tests failed validation")
             
         # Update test generation history
-        self._update_test_generation_knowledge()
+        self._update_test_generation_knowledge(batch_ts)
         
         self.status = "ready"
         self.logger.info(f"Generated {len(tests)} tests at {self.current_complexity} complexity")
         
         return tests
     
-    def _generate_single_test(self):
-        """Generate a single test using the LLM"""
-        # Select a test type
-        test_type = random.choice(self.test_types)
+    def _generate_single_test(self, test_type=None, batch_ts=None):
+        """Generate a single test of the given type using the LLM"""
+        if test_type is None:
+            test_type = random.choice(self.test_types)
+        if batch_ts is None:
+            batch_ts = time.time()
         
         # Get previous knowledge to inform test generation
-        previous_tests = self._get_recent_tests(5)
-        previous_results = self._get_recent_results(5)
+        previous_tests_json, previous_results_json = self._get_context_json(test_type)
         
         # Create the prompt for the LLM
-        system_prompt = """
-        You are a test generator for a self-improving multi-agent system. 
-        Your task is to create challenging but fair tests that will help the system learn and improve.
-        Generate a single test case as a JSON object.
-        """
-        
-        prompt = f"""
-        Please generate a {self.current_complexity} level {test_type} test for our self-improving agent system.
-        
-        The test should:
-        - Be appropriately challenging for the {self.current_complexity} complexity level
-        - Have clear success criteria
-        - Include necessary code or inputs
-        - Be self-contained and executable
+        system_prompt = self._SYSTEM_PROMPT
+        template = self._prompt_templates.get((self.current_complexity, test_type))
+        if template is None:
+            template = self._specialize_prompt(self.current_complexity, test_type)
+        prompt = template.format_map({
+            "previous_tests": previous_tests_json,
+            "previous_results": previous_results_json,
+            "learned_patterns": self._learned_patterns_json
+        })
         
-        Previous tests the system has seen:
-        {json.dumps(previous_tests, indent=2)}
+        # Identical prompts get the cached test instead of another LLM round-trip
+        cache_key = hashlib.sha256(f"{system_prompt}\n{prompt}".encode("utf-8")).hexdigest()
+        cached = self._get_cached_response(cache_key, batch_ts)
+        if cached is not None:
+            cached["generated_at"] = batch_ts
+            return cached
         
-        Recent test results:
-        {json.dumps(previous_results, indent=2)}
-
-        Learned patterns to guide generation:
-        {json.dumps(self.learned_patterns, indent=2)}
-        
-        Return ONLY a JSON object with these fields:
-        {{
-            "name": "Name of the test",
-            "type": "{test_type}",
-            "complexity": "{self.current_complexity}",
-            "description": "Description of what the test evaluates",
-            "inputs": {{...}},
-            "code": "Code to execute (if needed)",
-            "success_criteria": "Clear conditions for passing",
-            "timeout_seconds": 30
-        }}
-        """
+        # Fallback responses stand in for the model and must not be replayed once it is back
+        from_fallback = self.model_failure_count >= self.max_model_failures
         
         # Query the model for test generation
         response = self.query_model(prompt, system_prompt=system_prompt)
@@ -147,64 +319,123 @@ class TestGenerator(BaseAgent):
         # Parse the JSON response
         try:
             # Extract JSON from the response if needed
-            json_str = self._extract_json(response)
-            test_data = json.loads(json_str)
+            test_data = self._extract_json_obj(response)
+            if test_data is None:
+                raise ValueError("No JSON object found in model response")
             
             # Add metadata
-            test_data["generated_at"] = time.time()
+            test_data["generated_at"] = batch_ts
             test_data["generator_version"] = "1.0"
             
+            if not from_fallback:
+                self._cache_response(cache_key, test_data, batch_ts)
             return test_data
         except Exception as e:
             self.logger.error(f"Error parsing test response: {e}")
             # Return a fallback test
-            return self._generate_fallback_test(test_type)
+            return self._generate_fallback_test(test_type, batch_ts)
     
-    def _extract_json(self, text):
-        """Extract JSON string from text that might contain other content"""
-        try:
-            # Try to parse the whole text as JSON first
-            json.loads(text)
-            return text
-        except:
-            # Try to find JSON between curly braces
-            start = text.find('{')
-            end = text.rfind('}') + 1
+    def _specialize_prompt(self, complexity, test_type):
+        """Fill the static fields of the prompt template, leaving the context placeholders"""
+        return self._PROMPT_TEMPLATE.replace("{complexity}", complexity).replace("{test_type}", test_type)
+    
+    def _get_cached_response(self, cache_key, batch_ts):
+        """Return a copy of a cached test for this prompt, or None
+        
+        Each entry is served at most once per batch, so the slots of a batch never share a test.
+        """
+        with self._response_cache_lock:
+            cached = self._response_cache.get(cache_key)
+            if cached is None or cached[0] == batch_ts:
+                return None
+            self._response_cache[cache_key] = (batch_ts, cached[1])
+            self._response_cache.move_to_end(cache_key)
+        return copy.deepcopy(cached[1])
+    
+    def _cache_response(self, cache_key, test_data, batch_ts):
+        """Store a parsed test in the LRU response cache, as already served to this batch"""
+        with self._response_cache_lock:
+            self._response_cache[cache_key] = (batch_ts, copy.deepcopy(test_data))
+            self._response_cache.move_to_end(cache_key)
+            while len(self._response_cache) > self._response_cache_size:
+                self._response_cache.popitem(last=False)
+    
+    def _extract_json_obj(self, text):
+        """Parse the first JSON object in text that might contain other content"""
+        if not text:
+            return None
             
-            if start >= 0 and end > 0:
-                json_str = text[start:end]
-                try:
-                    # Validate it's parseable
-                    json.loads(json_str)
-                    return json_str
-                except:
-                    pass
-                    
-            # Another approach is to look for code blocks in markdown
-            if "```json" in text and "```" in text[text.find("```json")+7:]:
-                start = text.find("```json") + 7
-                end = text.find("```", start)
-                json_str = text[start:end].strip()
-                return json_str
-                
-            # Fallback: just return the original text and let the caller handle the error
-            return text
+        # Fast path: the whole response is a JSON object
+        stripped = text.strip()
+        if stripped.startswith('{') and stripped.endswith('}'):
+            try:
+                obj = json_utils.loads(stripped)
+                if isinstance(obj, dict):
+                    return obj
+            except json_utils.JSONDecodeError:
+                pass
+            
+        # Decode from each '{' in turn; this covers bare JSON, JSON surrounded
+        # by prose and markdown code blocks with a single parse on success
+        idx = text.find('{')
+        while idx >= 0:
+            try:
+                obj, _ = _JSON_DECODER.raw_decode(text, idx)
+                if isinstance(obj, dict):
+                    return obj
+            except json.JSONDecodeError:
+                pass
+            idx = text.find('{', idx + 1)
+            
+        return None
     
-    def _generate_fallback_test(self, test_type):
+    def _generate_fallback_test(self, test_type, batch_ts=None):
         """Generate a fallback test when LLM parsing fails"""
-        # Ensure parameter names in function match input keys
+        test = dict(self._FALLBACK_PROTO)
+        test["name"] = f"Fallback {test_type.capitalize()} Test"
+        test["type"] = test_type
+        test["complexity"] = self.current_complexity
+        test["inputs"] = dict(test["inputs"])  # Don't share the nested dict between tests
+        test["generated_at"] = batch_ts if batch_ts is not None else time.time()
+        return test
+    
+    def _get_context_json(self, test_type):
+        """Serialize related tests and recent results, reusing the last result until test history changes"""
+        version = self.memory.test_history_version
+        key = (self.current_complexity, test_type)
+        cached = self._context_json_cache.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+            
+        related_tests = [
+            {field: test.get(field) for field in self._TEST_SUMMARY_FIELDS}
+            for test in self._find_related_tests(test_type, 3)
+        ]
+        recent_results = [self._summarize_result(r) for r in self._get_recent_results(5)]
+        context_json = (
+            json_utils.dumps(related_tests, indent=True, sort_keys=True),
+            json_utils.dumps(recent_results, indent=True, sort_keys=True)
+        )
+        self._context_json_cache[key] = (version, context_json)
+        return context_json
+    
+    def _find_related_tests(self, test_type, count=3, window=50):
+        """Pick recent tests matching the current complexity and the given type, newest first"""
+        recent_tests = self._get_recent_tests(window)
+        matching = [t for t in reversed(recent_tests)
+                    if t.get("type") == test_type and t.get("complexity") == self.current_complexity]
+        if len(matching) < count:
+            # Top up with the newest tests of any kind
+            matching.extend(t for t in reversed(recent_tests) if t not in matching)
+        return matching[:count]
+    
+    def _summarize_result(self, result):
+        """Reduce a test result to the fields that inform generation"""
+        reason = result.get("failure_reason") or result.get("error")
         return {
-            "name": f"Fallback {test_type.capitalize()} Test",
-            "type": test_type,
-            "complexity": self.current_complexity,
-            "description": "A basic test generated as fallback",
-            "inputs": {"value": 10},
-            "code": "def test_function(value):\n    return value * 2",  # Parameter name matches input key
-            "success_criteria": "Result should be twice the input value",
-            "timeout_seconds": 30,
-            "generated_at": time.time(),
-            "generator_version": "1.0",
-            "is_fallback": True
+            "test_id": result.get("test_id"),
+            "passed": result.get("passed", False),
+            "failure_reason": str(reason)[:100] if reason else None
         }
     
     def _get_recent_tests(self, count=5):
@@ -215,25 +446,25 @@ class TestGenerator(BaseAgent):
     def _get_recent_results(self, count=5):
         """Get the most recent test results from memory"""
         results = self.memory.test_history.get("results", {})
-        recent_results = []
         
-        # Flatten results from all tests
-        for test_id, test_results in results.items():
-            for result in test_results:
-                result["test_id"] = test_id
-                recent_results.append(result)
+        # Results are appended in time order, so only the tail of each test's
+        # list can make the cut; select the newest with a bounded heap
+        candidates = (
+            (result.get("timestamp", 0), test_id, result)
+            for test_id, test_results in results.items()
+            for result in test_results[-count:]
+        )
+        recent = heapq.nlargest(count, candidates, key=lambda x: x[0])
         
-        # Sort by timestamp and take most recent
-        recent_results.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
-        return recent_results[:count]
+        # Copy rather than tagging the stored result dicts in place
+        return [dict(result, test_id=test_id) for _, test_id, result in recent]
     
-    def _update_test_generation_knowledge(self):
+    def _update_test_generation_knowledge(self, batch_ts=None):
         """Update knowledge about test generation history and adapt complexity"""
-        # Calculate success rate from recent test results
-        recent_results = self._get_recent_results(10)
-        if recent_results:
-            success_count = sum(1 for r in recent_results if r.get("passed", False))
-            self.success_rate = success_count / len(recent_results)
+        # Calculate success rate from recent test outcomes
+        recent_outcomes = list(self._recent_outcomes)
+        if recent_outcomes:
+            self.success_rate = sum(recent_outcomes) / len(recent_outcomes)
         
         # Adapt complexity based on success rate
         self._adapt_complexity()
@@ -241,26 +472,29 @@ class TestGenerator(BaseAgent):
         # Save knowledge
         self.memory.save_knowledge("test_generation_history", {
             "current_complexity": self.current_complexity,
+            "complexity_index": self._complexity_idx,
             "success_rate": self.success_rate,
             "tests_generated": self.tests_generated,
-            "last_updated": time.time()
+            "recent_outcomes": recent_outcomes,
+            "last_updated": batch_ts if batch_ts is not None else time.time()
         })
     
+    def _on_test_result(self, test_id, result):
+        """Track the outcome of each saved test result"""
+        self._recent_outcomes.append(bool(result.get("passed", False)))
+    
     def _adapt_complexity(self):
         """Adapt the complexity level based on success rate"""
-        current_index = self.complexity_levels.index(self.current_complexity)
-        
-        # If success rate is high, increase complexity (more conservative)
-        if self.success_rate > 0.9 and current_index < len(self.complexity_levels) - 1:
-            self.current_complexity = self.complexity_levels[current_index + 1]
-            self.logger.info(f"Increased complexity to {self.current_complexity} (success rate: {self.success_rate:.2f})")
-            self.log_action("increase_complexity", {"new_level": self.current_complexity, "success_rate": self.success_rate})
-        
-        # If success rate is low, decrease complexity
-        elif self.success_rate < 0.5 and current_index > 0:
-            self.current_complexity = self.complexity_levels[current_index - 1]
-            self.logger.info(f"Decreased complexity to {self.current_complexity} (success rate: {self.success_rate:.2f})")
-            self.log_action("decrease_complexity", {"new_level": self.current_complexity, "success_rate": self.success_rate})
+        # +1 if success rate is high (more conservative), -1 if it is low, clamped to the valid range
+        delta = (self.success_rate > 0.9) - (self.success_rate < 0.5)
+        new_index = max(0, min(len(self.complexity_levels) - 1, self._complexity_idx + delta))
+        if new_index == self._complexity_idx:
+            return
+            
+        self._complexity_idx = new_index
+        direction = "increase" if delta > 0 else "decrease"
+        self.logger.info(f"{direction.capitalize()}d complexity to {self.current_complexity} (success rate: {self.success_rate:.2f})")
+        self.log_action(f"{direction}_complexity", {"new_level": self.current_complexity, "success_rate": self.success_rate})
     
     def _validate_test(self, test):
         """Validate that a test has valid Python syntax and required fields"""
@@ -273,23 +507,50 @@ class TestGenerator(BaseAgent):
             if field not in test:
                 return False, f"Missing required field: {field}"
         
+        # LLMs often repeat the same test; reuse the verdict for identical content
+        cache_key = self._validation_key(test)
+        if cache_key is not None and cache_key in self._validation_cache:
+            is_valid, message, normalized = self._validation_cache[cache_key]
+            test.update(copy.deepcopy(normalized))
+            return is_valid, message
+            
+        is_valid, message = self._validate_test_content(test)
+        
+        if cache_key is not None:
+            normalized = {f: copy.deepcopy(test[f]) for f in ("code", "inputs", "success_criteria")}
+            self._validation_cache[cache_key] = (is_valid, message, normalized)
+            while len(self._validation_cache) > self._validation_cache_size:
+                self._validation_cache.popitem(last=False)
+        
+        return is_valid, message
+    
+    def _validation_key(self, test):
+        """Hash the fields validation depends on, or None if they can't be serialized"""
+        try:
+            inputs = json_utils.dumps(test["inputs"], sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        content = f"{test['code']}|{inputs}|{test['success_criteria']}"
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    
+    def _validate_test_content(self, test):
+        """Validate and normalize the code, inputs and success criteria of a test"""
         # Validate code syntax
         code = test.get("code", "")
         try:
-            # Try to compile the code to check syntax
-            compile(code, "<string>", "exec")
-        except SyntaxError as e:
-            # Fix common syntax issues
-            fixed_code = self._fix_syntax(code, str(e))
-            if fixed_code:
-                test["code"] = fixed_code
-                # Try to compile again with fixed code
-                try:
-                    compile(fixed_code, "<string>", "exec")
-                except SyntaxError as e:
-                    return False, f"Invalid syntax after fixing: {str(e)}"
-            else:
-                return False, f"Invalid syntax: {str(e)}"
+            # Parse the code to check syntax (verdicts are memoized per code string)
+            error = _syntax_error(code)
+            if error:
+                # Fix common syntax issues
+                fixed_code = self._fix_syntax(code, error)
+                if fixed_code:
+                    test["code"] = fixed_code
+                    # Try to parse again with fixed code
+                    error = _syntax_error(fixed_code)
+                    if error:
+                        return False, f"Invalid syntax after fixing: {error}"
+                else:
+                    return False, f"Invalid syntax: {error}"
         except Exception as e:
             return False, f"Code validation error: {str(e)}"
             
@@ -312,37 +573,17 @@ class TestGenerator(BaseAgent):
         # Convert tabs to spaces
         code = code.replace("\t", "    ")
         
-        # Fix missing colons in function definitions
-        if "expected ':'" in error_message:
-            lines = code.split("\n")
-            for i, line in enumerate(lines):
-                if line.strip().startswith("def ") and ":" not in line:
-                    lines[i] = line + ":"
-            return "\n".join(lines)
-            
-        # Fix unclosed quotes
-        if "EOL while scanning string literal" in error_message:
-            lines = code.split("\n")
-            for i, line in enumerate(lines):
-                # Check for unclosed quotes
-                if (line.count("'") % 2 == 1) or (line.count('"') % 2 == 1):
-                    # Add closing quote of the same type
-                    if line.count("'") % 2 == 1:
-                        lines[i] = line + "'"
-                    if line.count('"') % 2 == 1:
-                        lines[i] = line + '"'
-            return "\n".join(lines)
-            
-        # Fix missing parentheses
-        if "unexpected EOF" in error_message and "parenthesis" in error_message:
-            open_parens = code.count('(')
-            close_parens = code.count(')')
-            if open_parens > close_parens:
-                return code + ')' * (open_parens - close_parens)
+        # Apply the first fixer matching the error message
+        for matches, fixer in _SYNTAX_FIXERS:
+            if matches(error_message):
+                fixed_code = fixer(code)
+                if fixed_code is not None:
+                    return fixed_code
+                break
                 
         # Fix unexpected characters in code
         if "\\n" in code:
             return code.replace("\\n", "\n")
             
         # Couldn't fix automatically
-        return None 
\ No newline at end of file
+        return None
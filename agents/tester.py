@@ -2,13 +2,145 @@ import logging
 import json
 import time
 import traceback
-import importlib.util
 import sys
 import os
-from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import re
+import builtins
+import array
+import math
+import statistics
+import textwrap
+import types
+import copy
+import functools
+import inspect
+import weakref
+import hashlib
+import threading
+import pickle
+import shelve
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
 from agents.base_agent import BaseAgent
+from utils import json_utils
+
+# Code or criteria touching these modules may give a different result each run
+_NONDETERMINISTIC_RE = re.compile(r"\b(?:time|random|datetime|uuid|secrets)\.")
+
+@functools.lru_cache(maxsize=1024)
+def _compile_test_code(code):
+    """Compile test source once; reruns of the same code reuse the code object"""
+    return compile(code, "<test>", "exec")
+
+class _LazyTraceback:
+    """Traceback text for an exception, formatted only when first read"""
+    __slots__ = ("exc", "_text")
+    
+    def __init__(self, exc):
+        self.exc = exc
+        self._text = None
+    
+    def __str__(self):
+        if self._text is None:
+            self._text = "".join(traceback.format_exception(type(self.exc), self.exc, self.exc.__traceback__))
+            self.exc = None  # Release the frames once formatted
+        return self._text
+    
+    def __reduce__(self):
+        # Pickling (to the parent process) and deepcopy yield the plain string
+        return (str, (str(self),))
+
+@functools.lru_cache(maxsize=1024)
+def _compile_criteria(criteria):
+    """Compile a success-criteria expression once per distinct string, or None if it isn't one"""
+    try:
+        return compile(criteria, "<criteria>", "eval")
+    except (SyntaxError, ValueError):
+        return None
+
+@functools.lru_cache(maxsize=256)
+def _compile_system_test(code):
+    """Compile system-test code as the body of a (system_manager, inputs) function, or None if it can't be wrapped"""
+    # Indenting would change the contents of multi-line strings
+    if '"""' in code or "'''" in code:
+        return None
+    source = "def _body(system_manager, inputs):\n" + textwrap.indent(code, "    ") + "\n    return locals()\n"
+    try:
+        module_code = compile(source, "<system-test>", "exec")
+    except SyntaxError:
+        return None
+    return next(const for const in module_code.co_consts if isinstance(const, types.CodeType))
+
+def _find_entry_point(namespace, names):
+    """Return the first callable among the given names, else the first test_* callable"""
+    for name in names:
+        obj = namespace.get(name)
+        if callable(obj):
+            return obj
+    return next((obj for name, obj in namespace.items() if name.startswith("test_") and callable(obj)), None)
+
+# Signature info per test function code object; entries go away with the code
+_signature_cache = weakref.WeakKeyDictionary()
+
+def _read_signature(function):
+    """Return (parameter names, their frozenset, whether **kwargs is accepted)"""
+    parameters = inspect.signature(function).parameters
+    accepts_kwargs = any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+    return tuple(parameters), frozenset(parameters), accepts_kwargs
+
+def _signature_params(function):
+    """Return a test function's signature info, cached by its code object"""
+    # Only plain, undecorated functions have a signature fixed by their code
+    if not inspect.isfunction(function) or hasattr(function, "__wrapped__"):
+        return _read_signature(function)
+    code = function.__code__
+    params = _signature_cache.get(code)
+    if params is None:
+        params = _signature_cache[code] = _read_signature(function)
+    return params
+
+def _timeout_seconds(test):
+    """A test's timeout in seconds as a float; missing or malformed values count as 30"""
+    try:
+        return float(test.get("timeout_seconds", 30))
+    except (TypeError, ValueError):
+        return 30.0
+
+# Tester used inside process-pool workers (one per worker process)
+_worker_tester = None
+
+def _worker_init():
+    """Set up a process-pool worker for running CPU-bound tests"""
+    global _worker_tester
+    _worker_tester = Tester(None, None, None)
+    _worker_tester._setup_test_environment()
+
+def _run_test_in_worker(test):
+    """Process-pool entry point: run a test and return a picklable result"""
+    result = _worker_tester._run_single_test(test)
+    try:
+        pickle.dumps(result.get("output"))
+    except Exception:
+        result["output"] = repr(result.get("output"))
+    return result
 
 class Tester(BaseAgent):
+    # Test types that need the live system (or do I/O) run on threads;
+    # everything else is CPU-bound exec() and runs in worker processes
+    THREAD_TEST_TYPES = frozenset(("integration", "system"))
+    # Seconds between checks for tests that have run past their timeout
+    TIMEOUT_POLL_INTERVAL = 0.5
+    # Test types whose results are never memoized (timings vary run to run)
+    UNMEMOIZED_TEST_TYPES = THREAD_TEST_TYPES | {"performance"}
+    # Performance-test input keys that configure the run rather than the call
+    PERF_CONTROL_KEYS = frozenset(("iterations", "capture_output", "return_per_iteration"))
+    # Outputs with more items than this skip the repr substring fallback
+    CRITERIA_FALLBACK_MAX_ITEMS = 100
+    # Bump when the shape of stored results changes to drop old disk entries
+    MEMO_FORMAT_VERSION = 1
+    
     def __init__(self, system_manager, memory_manager, model_name):
         super().__init__(system_manager, memory_manager, model_name)
         
@@ -20,6 +152,27 @@ class Tester(BaseAgent):
         # Execution environment setup
         self.test_env = {}
         self.max_workers = 3  # Max parallel test executions
+        self._proc_pool = None
+        self._thread_pool = None
+        
+        # Runner per test type; unknown types run as generic tests
+        self._test_runners = {
+            "function": self._run_function_test,
+            "integration": self._run_integration_test,
+            "system": self._run_system_test,
+            "performance": self._run_performance_test
+        }
+        
+        # LRU of results for deterministic tests keyed by a hash of
+        # (code, inputs, success_criteria)
+        self._result_cache = OrderedDict()
+        self._result_cache_size = 10000
+        self._result_cache_lock = threading.Lock()
+        
+        # On-disk copy of the result cache so restarts skip unchanged tests
+        self._disk_memo = None
+        self._disk_memo_size = 50000
+        self._disk_memo_cull_fraction = 0.1  # Share of oldest entries dropped when full
         
     def initialize(self):
         """Initialize the tester"""
@@ -28,6 +181,14 @@ class Tester(BaseAgent):
         # Create test execution environment
         self._setup_test_environment()
         
+        if self._disk_memo is None:
+            self._open_disk_memo()
+        
+        # Long-lived worker pools, reused by every batch until shutdown():
+        # processes for CPU-bound tests, threads for system tests
+        self._get_thread_pool()
+        self._get_process_pool()
+        
         # Load previous testing stats if available
         test_stats = self.memory.get_knowledge("test_execution_stats")
         if test_stats:
@@ -55,53 +216,295 @@ class Tester(BaseAgent):
         self.log_action("run_tests", {"count": len(tests)})
         
         # Run tests in parallel with timeout protection
-        results = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_to_test = {executor.submit(self._run_single_test, test): test for test in tests}
-            for future in future_to_test:
-                test = future_to_test[future]
+        results = [None] * len(tests)
+        future_to_index = {}
+        memo_keys = {}
+        batch_passed = 0  # Every other test in the batch failed (timeouts included)
+        
+        # Submit the longest-running tests first so they don't start last on a busy pool
+        for index in sorted(range(len(tests)), key=lambda i: self._estimate_duration(tests[i]), reverse=True):
+            test = tests[index]
+            # Identical deterministic tests reuse the previous result
+            memo_key = self._memo_key(test)
+            if memo_key is not None:
+                cached = self._get_memoized_result(memo_key, test)
+                if cached is not None:
+                    results[index] = cached
+                    batch_passed += self._record_result(test, cached)
+                    continue
+            
+            future = self._submit_test(test)
+            future_to_index[future] = index
+            if memo_key is not None:
+                memo_keys[future] = memo_key
+            
+        # Collect results as they finish; the list keeps submission order.
+        # A test's deadline starts once it is seen executing.
+        pending = set(future_to_index)
+        deadlines = {}
+        while pending:
+            now = time.time()
+            # A process-pool future counts as running as soon as it is queued for a
+            # worker, so only the oldest max_workers of those are actually executing
+            busy_workers = 0
+            for future in future_to_index:  # Submission order
+                if future not in pending or not future.running():
+                    continue
+                test = tests[future_to_index[future]]
+                if test.get("type") not in self.THREAD_TEST_TYPES:
+                    if busy_workers >= self.max_workers:
+                        continue
+                    busy_workers += 1
+                if future not in deadlines:
+                    deadlines[future] = now + _timeout_seconds(test)
+            
+            next_deadline = min((deadlines[f] for f in pending if f in deadlines), default=now + self.TIMEOUT_POLL_INTERVAL)
+            wait_time = min(max(0, next_deadline - now), self.TIMEOUT_POLL_INTERVAL)
+            done, pending = wait(pending, timeout=wait_time, return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                index = future_to_index[future]
+                test = tests[index]
                 try:
                     result = future.result()
-                    results.append(result)
-                    
-                    # Save result to memory
-                    self.memory.save_test_result(test["id"], result)
-                    
-                    # Update stats
-                    self.tests_run += 1
-                    if result["passed"]:
-                        self.tests_passed += 1
-                    else:
-                        self.tests_failed += 1
-                        
+                    if future in memo_keys:
+                        self._memoize_result(memo_keys[future], result)
                 except Exception as e:
+                    if isinstance(e, BrokenProcessPool):
+                        self._proc_pool = None  # A worker died; start a fresh pool next time
                     self.logger.error(f"Error running test {test.get('id')}: {str(e)}")
-                    error_result = {
+                    result = {
                         "test_id": test.get("id"),
                         "passed": False,
                         "error": str(e),
-                        "traceback": traceback.format_exc(),
+                        "traceback": _LazyTraceback(e),
                         "timestamp": time.time(),
                         "execution_time": 0
                     }
-                    results.append(error_result)
-                    self.memory.save_test_result(test["id"], error_result)
-                    self.tests_run += 1
-                    self.tests_failed += 1
+                results[index] = result
+                batch_passed += self._record_result(test, result)
+            
+            # Enforce timeouts on tests that are still running
+            now = time.time()
+            expired = [f for f in pending if f in deadlines and deadlines[f] <= now]
+            if expired:
+                pending = self._expire_tests(expired, pending, tests, future_to_index, deadlines, results, memo_keys)
+        
+        # Save all results to memory in one write
+        self.memory.save_test_results([(test["id"], result) for test, result in zip(tests, results)])
         
         # Update knowledge about test execution
         self._update_test_execution_knowledge()
+        self._sync_disk_memo()
         
         self.status = "ready"
-        self.logger.info(f"Completed running {len(tests)} tests. Passed: {sum(1 for r in results if r['passed'])}, Failed: {sum(1 for r in results if not r['passed'])}")
+        self.logger.info(f"Completed running {len(tests)} tests. Passed: {batch_passed}, Failed: {len(tests) - batch_passed}")
         return results
     
+    def _estimate_duration(self, test):
+        """Expected run time of a test: its recent average, else its timeout"""
+        duration = self.memory.get_average_duration(test.get("id"))
+        return duration if duration is not None else _timeout_seconds(test)
+    
+    def _record_result(self, test, result):
+        """Update the stats for a finished test and return whether it passed"""
+        self.tests_run += 1
+        if result["passed"]:
+            self.tests_passed += 1
+            return True
+        self.tests_failed += 1
+        return False
+    
+    def _memo_key(self, test):
+        """Hash the fields a deterministic test's result depends on, or None if it can't be memoized"""
+        if test.get("type") in self.UNMEMOIZED_TEST_TYPES or test.get("deterministic") is False:
+            return None
+        code = test.get("code", "")
+        criteria = str(test.get("success_criteria", ""))
+        if not test.get("deterministic") and _NONDETERMINISTIC_RE.search(code + "\n" + criteria):
+            return None
+        try:
+            inputs = json_utils.dumps(test.get("inputs", {}), sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        content = f"{code}|{inputs}|{criteria}"
+        return hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+    
+    def _get_memoized_result(self, memo_key, test):
+        """Return a copy of a memoized result for this test, or None"""
+        with self._result_cache_lock:
+            cached = self._result_cache.get(memo_key)
+            if cached is None:
+                cached = self._load_disk_memo(memo_key)
+                if cached is None:
+                    return None
+                self._result_cache[memo_key] = cached
+                while len(self._result_cache) > self._result_cache_size:
+                    self._result_cache.popitem(last=False)
+            self._result_cache.move_to_end(memo_key)
+        result = copy.deepcopy(cached)
+        result["test_id"] = test.get("id")
+        result["timestamp"] = time.time()
+        return result
+    
+    def _memoize_result(self, memo_key, result):
+        """Store a finished test's result in the LRU result cache"""
+        with self._result_cache_lock:
+            self._result_cache[memo_key] = copy.deepcopy(result)
+            self._result_cache.move_to_end(memo_key)
+            while len(self._result_cache) > self._result_cache_size:
+                self._result_cache.popitem(last=False)
+            self._store_disk_memo(memo_key, result)
+    
+    def _open_disk_memo(self):
+        """Open the on-disk result cache, dropping it if it was written by another format or Python"""
+        path = os.path.join(self.test_env["test_dir"], ".tester_memo")
+        version = [self.MEMO_FORMAT_VERSION, sys.version_info[0], sys.version_info[1]]
+        try:
+            self._disk_memo = shelve.open(path, protocol=5)
+            if self._disk_memo.get("__version__") != version:
+                self._disk_memo.clear()
+                self._disk_memo["__version__"] = version
+            elif len(self._disk_memo) > self._disk_memo_size:
+                self._cull_disk_memo()
+        except Exception as e:
+            self.logger.warning(f"Could not open test result cache at {path}: {str(e)}")
+            self._disk_memo = None
+    
+    def _cull_disk_memo(self):
+        """Drop the oldest disk cache entries once the cache is over its size limit"""
+        stored = sorted((entry[0], key) for key, entry in self._disk_memo.items() if key != "__version__")
+        for _, key in stored[:int(len(stored) * self._disk_memo_cull_fraction)]:
+            del self._disk_memo[key]
+        self.logger.info(f"Culled test result cache to {len(self._disk_memo) - 1} entries")
+    
+    def _load_disk_memo(self, memo_key):
+        """Return a result from the disk cache, or None (caller holds the cache lock)"""
+        if self._disk_memo is None:
+            return None
+        try:
+            entry = self._disk_memo.get(memo_key.hex())
+        except Exception as e:
+            self.logger.warning(f"Error reading test result cache: {str(e)}")
+            return None
+        return entry[1] if entry else None
+    
+    def _store_disk_memo(self, memo_key, result):
+        """Write a result to the disk cache (caller holds the cache lock)"""
+        if self._disk_memo is None:
+            return
+        stored = {k: v for k, v in result.items() if k != "timestamp"}
+        try:
+            self._disk_memo[memo_key.hex()] = (time.time(), stored)
+        except Exception as e:
+            self.logger.warning(f"Error writing test result cache: {str(e)}")
+    
+    def _sync_disk_memo(self):
+        """Flush pending disk cache writes"""
+        with self._result_cache_lock:
+            if self._disk_memo is not None:
+                self._disk_memo.sync()
+    
+    def _submit_test(self, test):
+        """Submit a test to the pool matching its type"""
+        if test.get("type") in self.THREAD_TEST_TYPES:
+            return self._get_thread_pool().submit(self._run_single_test, test)
+        return self._get_process_pool().submit(_run_test_in_worker, test)
+    
+    def _expire_tests(self, expired, pending, tests, future_to_index, deadlines, results, memo_keys):
+        """Record timeouts for expired tests and return the futures still pending"""
+        pending = pending - set(expired)
+        kill_workers = False
+        for future in expired:
+            test = tests[future_to_index[future]]
+            timeout = _timeout_seconds(test)
+            self.logger.warning(f"Test {test.get('id')} timed out after {timeout} seconds")
+            
+            # Threads can't be interrupted; a stuck worker process can be killed
+            if not future.cancel() and test.get("type") not in self.THREAD_TEST_TYPES:
+                kill_workers = True
+            
+            result = {
+                "test_id": test.get("id"),
+                "passed": False,
+                "failure_reason": f"Test timed out after {timeout} seconds",
+                "timestamp": time.time(),
+                "execution_time": timeout
+            }
+            results[future_to_index[future]] = result
+            self._record_result(test, result)
+        
+        if kill_workers:
+            # Killing the workers breaks every unfinished test in the pool,
+            # so resubmit those to a fresh pool
+            requeue = [f for f in pending if tests[future_to_index[f]].get("type") not in self.THREAD_TEST_TYPES]
+            self._terminate_process_pool()
+            for future in requeue:
+                pending.discard(future)
+                deadlines.pop(future, None)
+                new_future = self._submit_test(tests[future_to_index[future]])
+                future_to_index[new_future] = future_to_index[future]
+                if future in memo_keys:
+                    memo_keys[new_future] = memo_keys[future]
+                pending.add(new_future)
+        
+        return pending
+    
+    def _terminate_process_pool(self):
+        """Kill the process pool's workers so runaway tests stop"""
+        pool, self._proc_pool = self._proc_pool, None
+        if pool is None:
+            return
+        # shutdown() clears pool._processes, so grab the workers first
+        processes = list((pool._processes or {}).values())
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.kill()
+                process.join(timeout=1)
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _create_process_pool(self):
+        """Create the process pool used for CPU-bound tests"""
+        # Spawn rather than fork: the parent runs Qt and agent threads
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init
+        )
+    
+    def _get_process_pool(self):
+        """Return the process pool, recreating it after a worker crash"""
+        if self._proc_pool is None:
+            self._proc_pool = self._create_process_pool()
+        return self._proc_pool
+    
+    def _get_thread_pool(self):
+        """Return the thread pool, creating it if needed"""
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tester")
+        return self._thread_pool
+    
+    def shutdown(self):
+        """Stop the worker pools and close the on-disk result cache"""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+        self._terminate_process_pool()
+        
+        with self._result_cache_lock:
+            if self._disk_memo is not None:
+                self._disk_memo.close()
+                self._disk_memo = None
+        self.logger.info("Tester shut down")
+    
     def _run_single_test(self, test):
         """Run a single test with timeout protection"""
         test_id = test.get("id", "unknown")
         test_name = test.get("name", f"Test {test_id}")
         test_type = test.get("type", "unknown")
-        timeout = test.get("timeout_seconds", 30)
         
         self.logger.info(f"Running test {test_id}: {test_name} (type: {test_type})")
         
@@ -115,16 +518,7 @@ class Tester(BaseAgent):
         
         try:
             # Execute the test based on its type
-            if test_type == "function":
-                test_result = self._run_function_test(test)
-            elif test_type == "integration":
-                test_result = self._run_integration_test(test)
-            elif test_type == "system":
-                test_result = self._run_system_test(test)
-            elif test_type == "performance":
-                test_result = self._run_performance_test(test)
-            else:
-                test_result = self._run_generic_test(test)
+            test_result = self._test_runners.get(test_type, self._run_generic_test)(test)
             
             execution_time = time.time() - start_time
             
@@ -139,19 +533,12 @@ class Tester(BaseAgent):
             if not test_result.get("passed", False):
                 result["failure_reason"] = test_result.get("failure_reason", "Unknown failure")
                 
-        except TimeoutError:
-            execution_time = time.time() - start_time
-            result.update({
-                "passed": False,
-                "failure_reason": f"Test timed out after {timeout} seconds",
-                "execution_time": execution_time
-            })
         except Exception as e:
             execution_time = time.time() - start_time
             result.update({
                 "passed": False,
                 "failure_reason": str(e),
-                "traceback": traceback.format_exc(),
+                "traceback": _LazyTraceback(e),
                 "execution_time": execution_time
             })
         
@@ -172,6 +559,9 @@ class Tester(BaseAgent):
             "test_dir": test_dir
         }
         
+        # Globals each test's namespace is copied from
+        self._base_globals = {"__builtins__": builtins, "__name__": "test_module"}
+        
         return self.test_env
     
     def _run_function_test(self, test):
@@ -180,34 +570,28 @@ class Tester(BaseAgent):
         inputs = test.get("inputs", {})
         success_criteria = test.get("success_criteria", "")
         
-        # Create a temporary module to execute the code
-        spec = importlib.util.spec_from_loader("test_module", loader=None)
-        test_module = importlib.util.module_from_spec(spec)
+        # Namespace the test code runs in
+        namespace = self._base_globals.copy()
         
         try:
-            # Execute the code in the module
-            exec(code, test_module.__dict__)
+            # Execute the code in the namespace
+            exec(_compile_test_code(code), namespace)
             
             # Try to identify the main function to call
-            main_function = None
-            for name, obj in test_module.__dict__.items():
-                if callable(obj) and (name.startswith("test_") or name == "main"):
-                    main_function = obj
-                    break
+            main_function = _find_entry_point(namespace, ("main",))
             
             # If we found a main function, call it with inputs
             if main_function:
                 # Log function parameters for debugging
-                import inspect
-                sig = inspect.signature(main_function)
-                param_names = list(sig.parameters.keys())
-                self.logger.info(f"Function '{main_function.__name__}' expects parameters: {param_names}")
-                self.logger.info(f"Test inputs: {inputs}")
+                param_names, param_set, accepts_kwargs = _signature_params(main_function)
+                if self.logger.isEnabledFor(logging.INFO):
+                    self.logger.info(f"Function '{main_function.__name__}' expects parameters: {list(param_names)}")
+                    self.logger.info(f"Test inputs: {inputs}")
                 
-                # Check for parameter mismatch
-                if isinstance(inputs, dict) and param_names:
-                    if set(inputs.keys()) != set(param_names):
-                        self.logger.warning(f"Parameter name mismatch in test {test.get('id')}: function expects {param_names}, but inputs has {list(inputs.keys())}")
+                # Check for parameter mismatch (any keys are valid with **kwargs)
+                if isinstance(inputs, dict) and inputs and param_names and not accepts_kwargs:
+                    if inputs.keys() != param_set:
+                        self.logger.warning(f"Parameter name mismatch in test {test.get('id')}: function expects {list(param_names)}, but inputs has {list(inputs.keys())}")
                 
                 # Execute the function
                 try:
@@ -223,7 +607,7 @@ class Tester(BaseAgent):
                     }
                     
                     # Check success criteria
-                    success = self._evaluate_success(output, success_criteria, test_module.__dict__)
+                    success = self._evaluate_success(output, success_criteria, namespace)
                     result["passed"] = success
                     
                     if not success:
@@ -238,7 +622,7 @@ class Tester(BaseAgent):
                         "failure_reason": str(e),
                         "details": {
                             "type": "parameter_mismatch",
-                            "function_params": param_names,
+                            "function_params": list(param_names),
                             "input_keys": list(inputs.keys()) if isinstance(inputs, dict) else "non-dict input"
                         }
                     }
@@ -253,14 +637,12 @@ class Tester(BaseAgent):
             return {
                 "passed": False,
                 "failure_reason": str(e),
-                "traceback": traceback.format_exc(),
+                "traceback": _LazyTraceback(e),
                 "details": {"type": "execution_error"}
             }
     
-    def _run_integration_test(self, test):
-        """Run an integration test involving multiple components"""
-        # Integration tests are similar to function tests but involve multiple components
-        return self._run_function_test(test)
+    # Integration tests are similar to function tests but involve multiple components
+    _run_integration_test = _run_function_test
     
     def _run_system_test(self, test):
         """Run a system test involving the entire system"""
@@ -269,14 +651,18 @@ class Tester(BaseAgent):
         inputs = test.get("inputs", {})
         
         try:
-            # Create a local context with access to the system manager
-            local_context = {
-                "system_manager": self.system_manager,
-                "inputs": inputs
-            }
-            
-            # Execute the test code with access to the system
-            exec(code, globals(), local_context)
+            # Run the test code as a function with access to the system, so its
+            # variables are fast locals; its locals() become the context
+            body_code = _compile_system_test(code)
+            if body_code is not None:
+                local_context = types.FunctionType(body_code, globals())(self.system_manager, inputs)
+            else:
+                # Code that can't be wrapped runs with a plain locals dict
+                local_context = {
+                    "system_manager": self.system_manager,
+                    "inputs": inputs
+                }
+                exec(code, globals(), local_context)
             
             # Check if the test explicitly set a result
             if "result" in local_context:
@@ -300,7 +686,7 @@ class Tester(BaseAgent):
                 "passed": False,
                 "output": None,
                 "failure_reason": str(e),
-                "traceback": traceback.format_exc()
+                "traceback": _LazyTraceback(e)
             }
     
     def _run_performance_test(self, test):
@@ -311,19 +697,15 @@ class Tester(BaseAgent):
         iterations = inputs.get("iterations", 1)
         
         try:
-            # Create a test module
-            spec = importlib.util.spec_from_loader("perf_test", loader=None)
-            test_module = importlib.util.module_from_spec(spec)
+            # Namespace the test code runs in
+            namespace = self._base_globals.copy()
+            namespace["__name__"] = "perf_test"
             
             # Execute the setup code
-            exec(code, test_module.__dict__)
+            exec(_compile_test_code(code), namespace)
             
             # Find the main function to benchmark
-            main_function = None
-            for name, obj in test_module.__dict__.items():
-                if callable(obj) and (name.startswith("test_") or name == "main" or name == "benchmark"):
-                    main_function = obj
-                    break
+            main_function = _find_entry_point(namespace, ("main", "benchmark"))
             
             if not main_function:
                 return {
@@ -332,40 +714,58 @@ class Tester(BaseAgent):
                     "failure_reason": "No benchmark function found in performance test"
                 }
             
-            # Run the benchmark
-            start_time = time.time()
-            results = []
+            # Bind the inputs once so the timed loop only makes the call
+            if isinstance(inputs, dict) and "args" in inputs:
+                call = functools.partial(main_function, *inputs["args"])
+            elif isinstance(inputs, dict):
+                # Filter out special keys like 'iterations'
+                function_inputs = {k: v for k, v in inputs.items() if k not in self.PERF_CONTROL_KEYS}
+                call = functools.partial(main_function, **function_inputs)
+            else:
+                call = functools.partial(main_function, inputs)
             
+            # Outputs are only kept (and stringified) when asked for, and
+            # per-iteration records only built when asked for
+            capture_output = isinstance(inputs, dict) and inputs.get("capture_output", False)
+            per_iteration = capture_output or (isinstance(inputs, dict) and inputs.get("return_per_iteration", False))
+            outputs = [None] * iterations if capture_output else None
+            times_ns = array.array("q", [0]) * iterations  # One flat buffer of timings
+            perf_counter_ns = time.perf_counter_ns
+            
+            # Run the benchmark
+            start_ns = perf_counter_ns()
             for i in range(iterations):
-                iteration_start = time.time()
-                
-                if isinstance(inputs, dict) and "args" in inputs:
-                    output = main_function(*inputs["args"])
-                elif isinstance(inputs, dict):
-                    # Filter out special keys like 'iterations'
-                    function_inputs = {k: v for k, v in inputs.items() if k != "iterations"}
-                    output = main_function(**function_inputs)
-                else:
-                    output = main_function(inputs)
-                
-                iteration_time = time.time() - iteration_start
-                results.append({
-                    "iteration": i,
-                    "time": iteration_time,
-                    "output": str(output)
-                })
+                iteration_start = perf_counter_ns()
+                output = call()
+                times_ns[i] = perf_counter_ns() - iteration_start
+                if outputs is not None:
+                    outputs[i] = output
+            total_time = (perf_counter_ns() - start_ns) / 1e9
             
-            total_time = time.time() - start_time
-            avg_time = total_time / iterations if iterations > 0 else 0
+            if iterations > 0:
+                ordered = sorted(times_ns)
+                avg_time = statistics.fmean(times_ns) / 1e9
+                min_time = ordered[0] / 1e9
+                p99_time = ordered[math.ceil(0.99 * iterations) - 1] / 1e9
+            else:
+                avg_time = min_time = p99_time = 0
             
             # Evaluate success based on criteria and performance data
             performance_data = {
                 "total_time": total_time,
                 "average_time": avg_time,
-                "iterations": iterations,
-                "results": results
+                "min_time": min_time,
+                "p99_time": p99_time,
+                "iterations": iterations
             }
             
+            if per_iteration:
+                results = [{"iteration": i, "time": t / 1e9} for i, t in enumerate(times_ns)]
+                if outputs is not None:
+                    for entry, output in zip(results, outputs):
+                        entry["output"] = str(output)
+                performance_data["results"] = results
+            
             # Check if it meets performance criteria
             success = self._evaluate_performance(performance_data, success_criteria)
             
@@ -381,13 +781,11 @@ class Tester(BaseAgent):
                 "passed": False,
                 "output": None,
                 "failure_reason": str(e),
-                "traceback": traceback.format_exc()
+                "traceback": _LazyTraceback(e)
             }
     
-    def _run_generic_test(self, test):
-        """Run a generic test when the type is unknown"""
-        # Default to function test behavior
-        return self._run_function_test(test)
+    # Generic tests (unknown type) default to function test behavior
+    _run_generic_test = _run_function_test
     
     def _evaluate_success(self, output, criteria, context=None):
         """Evaluate if the test output meets the success criteria"""
@@ -397,23 +795,33 @@ class Tester(BaseAgent):
         context = context or {}
         context["output"] = output
         
-        try:
-            # First try to evaluate as a Python expression
-            result = eval(criteria, {"__builtins__": {}}, context)
-            if isinstance(result, bool):
-                return result
-        except:
-            # If that fails, use a more general approach
-            if isinstance(output, (str, int, float, bool)):
-                # Simple string contains check
-                if isinstance(criteria, str) and isinstance(output, str):
-                    return criteria in output or output == criteria
-                # Numeric comparison
-                elif isinstance(output, (int, float)) and isinstance(criteria, (int, float)):
-                    return output == criteria
-            
-            # Check if criteria appears in string representation
-            return str(criteria) in str(output)
+        # Invalid expressions (cached as None) go straight to the fallback checks
+        code = _compile_criteria(criteria) if isinstance(criteria, str) else None
+        if code is not None:
+            try:
+                # First try to evaluate as a Python expression
+                result = eval(code, {"__builtins__": {}}, context)
+                if isinstance(result, bool):
+                    return result
+                return None
+            except Exception:
+                pass
+        
+        # If that fails, use a more general approach
+        if isinstance(output, (str, int, float, bool)):
+            # Simple string contains check
+            if isinstance(criteria, str) and isinstance(output, str):
+                return criteria in output or output == criteria
+            # Numeric comparison
+            elif isinstance(output, (int, float)) and isinstance(criteria, (int, float)):
+                return output == criteria
+        
+        # A substring match against a large container's repr is meaningless
+        if isinstance(output, (dict, list, tuple, set)) and len(output) > self.CRITERIA_FALLBACK_MAX_ITEMS:
+            return False
+        
+        # Check if criteria appears in string representation
+        return str(criteria) in str(output)
     
     def _evaluate_performance(self, perf_data, criteria):
         """Evaluate if performance data meets criteria"""
@@ -421,19 +829,25 @@ class Tester(BaseAgent):
             return True
             
         # Try to evaluate criteria as an expression
-        try:
-            # Create a context with performance data
-            context = {
-                "total_time": perf_data["total_time"],
-                "average_time": perf_data["average_time"],
-                "iterations": perf_data["iterations"]
-            }
-            
-            # Evaluate the criteria
-            return eval(criteria, {"__builtins__": {}}, context)
-        except:
-            # Fallback to simple string comparison
-            return str(criteria) in str(perf_data)
+        code = _compile_criteria(criteria) if isinstance(criteria, str) else None
+        if code is not None:
+            try:
+                # Create a context with performance data
+                context = {
+                    "total_time": perf_data["total_time"],
+                    "average_time": perf_data["average_time"],
+                    "min_time": perf_data.get("min_time", 0),
+                    "p99_time": perf_data.get("p99_time", 0),
+                    "iterations": perf_data["iterations"]
+                }
+                
+                # Evaluate the criteria
+                return eval(code, {"__builtins__": {}}, context)
+            except Exception:
+                pass
+        
+        # Fallback to simple string comparison
+        return str(criteria) in str(perf_data)
     
     def _update_test_execution_knowledge(self):
         """Update knowledge about test execution stats"""
@@ -1,10 +1,58 @@
 import logging
 import json
+import re
 import time
 import threading
-import queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from agents.base_agent import BaseAgent
+from utils import json_utils
+
+_JSON_DECODER = json.JSONDecoder()
+_JSON_BLOCK_RE = re.compile(r"```json(.*?)```", re.S)
+
+# Prompts mentioning any of these get the system status as context
+_NEEDS_STATUS_RE = re.compile(r"\b(?:status|health|agents?|cycles?|running|errors?|tests?)\b", re.I)
+
+# Queue priority per priority name; unknown names get medium
+_PRIORITY = {"high": 0, "medium": 1, "low": 2}
+
+def _truncate(text, limit=100):
+    """Shorten text to limit characters plus an ellipsis; short text is returned as is"""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+class _PendingRequests:
+    """Pending action requests, one FIFO per priority (0 = high) each behind its own lock"""
+    
+    def __init__(self, priorities=(0, 1, 2)):
+        self._order = tuple(sorted(priorities))
+        self._queues = {p: deque() for p in self._order}
+        self._locks = {p: threading.Lock() for p in self._order}
+    
+    def put(self, request):
+        """Add a request to the queue for its priority"""
+        priority = request["priority"]
+        with self._locks[priority]:
+            self._queues[priority].append(request)
+    
+    def get_batch(self, max_items):
+        """Pop up to max_items requests in priority order, taking each lock once"""
+        batch = []
+        for priority in self._order:
+            if len(batch) >= max_items:
+                break
+            with self._locks[priority]:
+                pending = self._queues[priority]
+                while pending and len(batch) < max_items:
+                    batch.append(pending.popleft())
+        return batch
+    
+    def empty(self):
+        return not any(self._queues.values())
+    
+    def qsize(self):
+        return sum(len(q) for q in self._queues.values())
 
 class UserInterface(BaseAgent):
     def __init__(self, system_manager, memory_manager, model_name):
@@ -12,12 +60,37 @@ class UserInterface(BaseAgent):
         
         # User interaction tracking
         self.interactions = 0
-        self.pending_requests = queue.Queue()
+        self._interactions_lock = threading.Lock()
+        self.pending_requests = _PendingRequests()
         self.processing_thread = None
         self.processing_active = False
+        self._work_event = threading.Event()  # Set when actions are queued or on stop
         
-        # Response history
-        self.response_history = []
+        # Response history (most recent 20)
+        self.response_history = deque(maxlen=20)
+        
+        # Last formatted system status as (status key, text)
+        self._status_cache = (None, None)
+        
+        # Last system status as (monotonic time, status), reused for bursts of prompts
+        self._status_snapshot = (0.0, None)
+        self.status_snapshot_ttl = 2.0  # Seconds
+        
+        # Workers that run prompts submitted with submit_prompt()
+        self._llm_pool = None
+        self.max_concurrent_prompts = 4
+        
+        # Action log entries buffered and handed to memory in batches
+        self._log_buffer = []
+        self._log_lock = threading.Lock()
+        self.log_batch_size = 32
+        
+        # Knowledge writes buffered and flushed in batches
+        self._pending_kv = {}
+        self._pending_kv_lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self.knowledge_flush_size = 8
+        self.knowledge_flush_interval = 2.0  # Seconds
         
     def initialize(self):
         """Initialize the user interface agent"""
@@ -27,10 +100,11 @@ class UserInterface(BaseAgent):
         ui_stats = self.memory.get_knowledge("ui_stats")
         if ui_stats:
             self.interactions = ui_stats.get("interactions", 0)
-            self.response_history = ui_stats.get("recent_responses", [])
+            self.response_history = deque(ui_stats.get("recent_responses", []), maxlen=20)
             
         # Start background processing thread
         self._start_processing_thread()
+        self._get_llm_pool()
             
         self.logger.info(f"User interface initialized. Previous interactions: {self.interactions}")
         return True
@@ -44,23 +118,29 @@ class UserInterface(BaseAgent):
         else:
             return self.process_pending_requests()
     
+    def submit_prompt(self, prompt):
+        """Process a user prompt on a worker thread and return a Future of the response"""
+        return self._get_llm_pool().submit(self.process_prompt, prompt)
+    
     def process_prompt(self, prompt):
         """Process a user prompt and generate a response"""
         self.status = "processing"
-        self.interactions += 1
+        with self._interactions_lock:
+            self.interactions += 1
+            interaction = self.interactions
         self.log_action("process_prompt", {"prompt_length": len(prompt)})
         
         self.logger.info(f"Processing user prompt: {prompt[:50]}...")
         
         # Create a request ID
-        request_id = f"request_{int(time.time())}_{self.interactions}"
+        request_id = f"request_{int(time.time())}_{interaction}"
         
         try:
-            # Get system state for context
-            system_status = self.system_manager.get_system_status()
-            
-            # Format system status for the prompt
-            status_str = self._format_system_status(system_status)
+            # System state is only added for prompts that are about the system
+            if _NEEDS_STATUS_RE.search(prompt):
+                status_str = self._format_system_status(self._get_system_status())
+            else:
+                status_str = "(omitted)"
             
             # Create the prompt for the LLM
             system_prompt = """
@@ -95,11 +175,11 @@ class UserInterface(BaseAgent):
             
             # Query the model for a response
             response = self.query_model(full_prompt, system_prompt=system_prompt)
+            answered_at = time.time()  # One timestamp for everything recorded below
             
             # Parse the JSON response
             try:
-                json_str = self._extract_json(response)
-                response_data = json.loads(json_str)
+                response_data = self._parse_json_response(response)
                 
                 # Extract the user-facing response
                 user_response = response_data.get("user_response", "I'm processing your request.")
@@ -107,17 +187,17 @@ class UserInterface(BaseAgent):
                 priority = response_data.get("priority", "medium")
                 
                 # Save the interaction to memory
-                self._save_interaction(request_id, prompt, user_response, response_data)
+                self._save_interaction(request_id, prompt, user_response, response_data, answered_at)
                 
                 # If there are actions to take, queue them for processing
                 if actions:
-                    self._queue_actions(request_id, actions, priority)
+                    self._queue_actions(request_id, actions, priority, answered_at)
                 
                 # Save the response to history
-                self._add_to_response_history(request_id, prompt, user_response)
+                self._add_to_response_history(request_id, prompt, user_response, answered_at)
                 
                 # Update UI stats
-                self._update_ui_stats()
+                self._update_ui_stats(answered_at)
                 
                 self.status = "ready"
                 return {
@@ -132,7 +212,7 @@ class UserInterface(BaseAgent):
                 # Return a fallback response
                 fallback_response = "I'm having trouble processing that request right now. Could you try again?"
                 
-                self._save_interaction(request_id, prompt, fallback_response, {"error": str(e)})
+                self._save_interaction(request_id, prompt, fallback_response, {"error": str(e)}, answered_at)
                 self.status = "ready"
                 
                 return {
@@ -150,6 +230,9 @@ class UserInterface(BaseAgent):
                 "response": "An error occurred while processing your request.",
                 "error": str(e)
             }
+        finally:
+            self._flush_action_log()
+            self._maybe_flush()
     
     def process_pending_requests(self):
         """Process any pending requests in the queue"""
@@ -162,27 +245,15 @@ class UserInterface(BaseAgent):
         self.status = "processing"
         self.log_action("process_pending_requests")
         
-        # Process up to 5 requests at a time
-        for _ in range(5):
+        # Process up to 5 requests at a time, taken from the queue in one pass
+        for request in self.pending_requests.get_batch(5):
             try:
-                if self.pending_requests.empty():
-                    break
-                    
-                # Get the next request
-                request = self.pending_requests.get_nowait()
-                
-                # Process the request
                 self._process_action(request)
                 processed += 1
-                
-                # Mark as done
-                self.pending_requests.task_done()
-                
-            except queue.Empty:
-                break
             except Exception as e:
                 self.logger.error(f"Error processing pending request: {e}")
         
+        self._flush_action_log()
         self.status = "ready"
         self.logger.info(f"Processed {processed} pending requests")
         
@@ -191,17 +262,18 @@ class UserInterface(BaseAgent):
             "remaining": self.pending_requests.qsize()
         }
     
-    def _queue_actions(self, request_id, actions, priority):
+    def _queue_actions(self, request_id, actions, priority, timestamp):
         """Queue actions for processing"""
-        priority_value = {"high": 0, "medium": 1, "low": 2}.get(priority, 1)
+        priority_value = _PRIORITY.get(priority, 1)
         
         for action in actions:
             self.pending_requests.put({
                 "request_id": request_id,
                 "action": action,
                 "priority": priority_value,
-                "timestamp": time.time()
+                "timestamp": timestamp
             })
+        self._work_event.set()
             
         self.logger.info(f"Queued {len(actions)} actions for request {request_id} with priority {priority}")
     
@@ -268,7 +340,7 @@ class UserInterface(BaseAgent):
                 self.logger.warning(f"Unknown action type: {action_type}")
                 
             # Record that the action was processed
-            self.memory.log_agent_action({
+            self._log_action_entry({
                 "agent": self.name,
                 "action": "process_action",
                 "timestamp": time.time(),
@@ -283,7 +355,7 @@ class UserInterface(BaseAgent):
             self.logger.error(f"Error processing action {action_type}: {e}")
             
             # Record the error
-            self.memory.log_agent_action({
+            self._log_action_entry({
                 "agent": self.name,
                 "action": "process_action_error",
                 "timestamp": time.time(),
@@ -294,24 +366,24 @@ class UserInterface(BaseAgent):
                 }
             })
     
-    def _save_interaction(self, request_id, prompt, response, full_data):
+    def _save_interaction(self, request_id, prompt, response, full_data, timestamp):
         """Save an interaction to memory"""
         interaction = {
             "request_id": request_id,
-            "timestamp": time.time(),
+            "timestamp": timestamp,
             "prompt": prompt,
             "response": response,
             "full_data": full_data
         }
         
         # Save to memory under a unique key
-        self.memory.save_knowledge(f"interaction_{request_id}", interaction)
+        self._queue_knowledge(f"interaction_{request_id}", interaction)
         
         # Also log the action
-        self.memory.log_agent_action({
+        self._log_action_entry({
             "agent": self.name,
             "action": "user_interaction",
-            "timestamp": time.time(),
+            "timestamp": timestamp,
             "details": {
                 "request_id": request_id,
                 "prompt_length": len(prompt),
@@ -319,73 +391,118 @@ class UserInterface(BaseAgent):
             }
         })
     
-    def _add_to_response_history(self, request_id, prompt, response):
+    def _add_to_response_history(self, request_id, prompt, response, timestamp):
         """Add a response to the history"""
         self.response_history.append({
             "request_id": request_id,
-            "timestamp": time.time(),
-            "prompt": prompt[:100] + ("..." if len(prompt) > 100 else ""),
-            "response": response[:100] + ("..." if len(response) > 100 else "")
+            "timestamp": timestamp,
+            "prompt": _truncate(prompt),
+            "response": _truncate(response)
         })
-        
-        # Keep only the last 20 responses
-        if len(self.response_history) > 20:
-            self.response_history = self.response_history[-20:]
     
-    def _update_ui_stats(self):
+    def _update_ui_stats(self, timestamp):
         """Update UI statistics"""
-        self.memory.save_knowledge("ui_stats", {
+        self._queue_knowledge("ui_stats", {
             "interactions": self.interactions,
-            "last_interaction": time.time(),
-            "recent_responses": self.response_history,
+            "last_interaction": timestamp,
+            "recent_responses": list(self.response_history),
             "pending_requests": self.pending_requests.qsize(),
-            "last_updated": time.time()
+            "last_updated": timestamp
         })
     
+    def _log_action_entry(self, entry):
+        """Buffer an action log entry, handing a full batch to memory"""
+        with self._log_lock:
+            self._log_buffer.append(entry)
+            if len(self._log_buffer) < self.log_batch_size:
+                return
+            entries, self._log_buffer = self._log_buffer, []
+        self.memory.log_agent_actions(entries)
+    
+    def _flush_action_log(self):
+        """Hand any buffered action log entries to memory"""
+        with self._log_lock:
+            entries, self._log_buffer = self._log_buffer, []
+        if entries:
+            self.memory.log_agent_actions(entries)
+    
+    def _queue_knowledge(self, concept, data):
+        """Buffer a knowledge write until the next flush"""
+        with self._pending_kv_lock:
+            self._pending_kv[concept] = data
+    
+    def _maybe_flush(self, force=False):
+        """Write buffered knowledge once enough has accumulated or enough time has passed"""
+        with self._pending_kv_lock:
+            if not self._pending_kv:
+                return
+            if (not force and len(self._pending_kv) < self.knowledge_flush_size
+                    and time.monotonic() - self._last_flush < self.knowledge_flush_interval):
+                return
+            pending, self._pending_kv = self._pending_kv, {}
+            self._last_flush = time.monotonic()
+        self.memory.save_knowledge_many(pending)
+    
+    def _get_system_status(self):
+        """Return the system status, reusing a snapshot taken within the last few seconds"""
+        taken_at, status = self._status_snapshot
+        now = time.monotonic()
+        if status is None or now - taken_at > self.status_snapshot_ttl:
+            status = self.system_manager.get_system_status()
+            self._status_snapshot = (now, status)
+        return status
+    
     def _format_system_status(self, status):
         """Format system status for inclusion in prompts"""
-        output = []
+        agents = status.get('agents', {})
+        key = (
+            status.get('running', False),
+            status.get('cycle_count', 0),
+            tuple((name, agent_status.get('status', 'unknown')) for name, agent_status in agents.items())
+        )
         
-        # Basic status
-        output.append(f"System running: {status.get('running', False)}")
-        output.append(f"Current cycle: {status.get('cycle_count', 0)}")
+        # Reuse the last formatted string while the status is unchanged
+        cached_key, cached_text = self._status_cache
+        if key == cached_key:
+            return cached_text
         
-        # Agent statuses
-        output.append("\nAgent Statuses:")
-        for name, agent_status in status.get('agents', {}).items():
-            output.append(f"- {name}: {agent_status.get('status', 'unknown')}")
+        running, cycle_count, agent_statuses = key
+        text = (
+            f"System running: {running}\n"
+            f"Current cycle: {cycle_count}\n"
+            "\nAgent Statuses:"
+            + "".join(f"\n- {name}: {agent_status}" for name, agent_status in agent_statuses)
+        )
         
-        return "\n".join(output)
+        self._status_cache = (key, text)
+        return text
     
-    def _extract_json(self, text):
-        """Extract JSON string from text that might contain other content"""
-        try:
-            # Try to parse the whole text as JSON first
-            json.loads(text)
-            return text
-        except:
-            # Try to find JSON between curly braces
-            start = text.find('{')
-            end = text.rfind('}') + 1
+    def _parse_json_response(self, text):
+        """Parse the JSON object in text that might contain other content, raising if there is none"""
+        # Fast path: the whole response is a JSON object
+        stripped = text.strip()
+        if stripped.startswith('{') and stripped.endswith('}'):
+            try:
+                return json_utils.loads(stripped)
+            except json_utils.JSONDecodeError:
+                pass
             
-            if start >= 0 and end > 0:
-                json_str = text[start:end]
-                try:
-                    # Validate it's parseable
-                    json.loads(json_str)
-                    return json_str
-                except:
-                    pass
-                    
-            # Another approach is to look for code blocks in markdown
-            if "```json" in text and "```" in text[text.find("```json")+7:]:
-                start = text.find("```json") + 7
-                end = text.find("```", start)
-                json_str = text[start:end].strip()
-                return json_str
+        # Decode from each '{' in turn: the C scanner handles nesting, string
+        # literals and escapes, so the first object is found and parsed at once
+        start = text.find('{')
+        while start >= 0:
+            try:
+                return _JSON_DECODER.raw_decode(text, start)[0]
+            except json.JSONDecodeError:
+                start = text.find('{', start + 1)
                 
-            # Fallback: just return the original text and let the caller handle the error
-            return text
+        # Another approach is to look for code blocks in markdown
+        match = _JSON_BLOCK_RE.search(text)
+        if match:
+            return json_utils.loads(match.group(1).strip())
+            
+        # Fallback: parse the original text so the caller gets the decode error
+        return json_utils.loads(text)
     
     def _start_processing_thread(self):
         """Start background thread for processing requests"""
@@ -398,31 +515,62 @@ class UserInterface(BaseAgent):
         self.processing_thread.start()
         self.logger.info("Started background processing thread")
     
+    def _get_llm_pool(self):
+        """Return the prompt worker pool, creating it if needed"""
+        if self._llm_pool is None:
+            self._llm_pool = ThreadPoolExecutor(max_workers=self.max_concurrent_prompts, thread_name_prefix="ui-llm")
+        return self._llm_pool
+    
+    def shutdown(self):
+        """Stop background processing and write out buffered knowledge and action logs"""
+        if self._llm_pool is not None:
+            self._llm_pool.shutdown(wait=False, cancel_futures=True)
+            self._llm_pool = None
+        self._stop_processing_thread()
+        self._flush_action_log()
+    
     def _stop_processing_thread(self):
         """Stop the background processing thread"""
         self.processing_active = False
+        self._work_event.set()
         if self.processing_thread:
             self.processing_thread.join(timeout=10.0)
             self.logger.info("Stopped background processing thread")
+        self._maybe_flush(force=True)
     
     def _processing_loop(self):
         """Background thread that periodically processes pending requests"""
+        # These objects live as long as the agent; bind them once for the loop
+        system_manager = self.system_manager
+        pending_requests = self.pending_requests
+        work_event = self._work_event
+        logger = self.logger
+        
         while self.processing_active:
             try:
-                # Sleep briefly
-                time.sleep(5)
+                # Block until actions are queued; the timeout re-checks
+                # requests left waiting while the system was not running
+                work_event.wait(timeout=30)
+                work_event.clear()
+                if not self.processing_active:
+                    break
+                
+                # Write out knowledge left buffered since the last prompt
+                self._maybe_flush()
                 
                 # Skip if the system is not running
-                if not self.system_manager.running:
+                if not system_manager.running:
                     continue
                 
                 # Skip if there are no pending requests
-                if self.pending_requests.empty():
+                if pending_requests.empty():
                     continue
                 
-                # Process pending requests
+                # Process pending requests, coming straight back if more remain
                 self.process_pending_requests()
+                if not pending_requests.empty():
+                    work_event.set()
                     
             except Exception as e:
-                self.logger.error(f"Error in processing loop: {str(e)}")
-                time.sleep(30)  # Sleep longer if there was an error 
\ No newline at end of file
+                logger.error(f"Error in processing loop: {str(e)}")
+                time.sleep(30)  # Sleep longer if there was an error
@@ -0,0 +1,105 @@
+import threading
+import time
+
+# Breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Per-agent circuit breaker with CLOSED -> OPEN -> HALF_OPEN -> CLOSED transitions.
+
+    While OPEN every call is rejected until reset_timeout has elapsed; the breaker then
+    goes HALF_OPEN and admits at most half_open_limit concurrent probe calls. It closes
+    again after success_threshold probe successes, and any probe failure re-opens it.
+    Times passed as `now` are time.monotonic() values.
+    """
+
+    def __init__(self, name, failure_threshold=3, success_threshold=2, reset_timeout=300, half_open_limit=1,
+                 on_state_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.success_threshold = success_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_limit = half_open_limit
+        # Called as on_state_change(breaker, old_state, new_state) on every transition
+        self.on_state_change = on_state_change
+
+        self.state = CLOSED
+        self.failures = 0
+        self.successes = 0
+        self.next_attempt = 0
+        self.half_open_inflight = 0
+        self.last_failure_time = 0
+        self._lock = threading.Lock()
+
+    @property
+    def open(self):
+        """True while the breaker is tripped and rejecting calls"""
+        return self.state == OPEN
+
+    def can_execute(self, now=None):
+        """Return True if a call may go through, moving OPEN to HALF_OPEN once the timeout expires"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if (time.monotonic() if now is None else now) < self.next_attempt:
+                    return False
+                self._set_state(HALF_OPEN)
+                self.successes = 0
+                self.half_open_inflight = 0
+            # HALF_OPEN: only admit a limited number of probe calls
+            if self.half_open_inflight >= self.half_open_limit:
+                return False
+            self.half_open_inflight += 1
+            return True
+
+    def on_success(self):
+        """Record a successful call"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.half_open_inflight = max(0, self.half_open_inflight - 1)
+                self.successes += 1
+                if self.successes >= self.success_threshold:
+                    self._close()
+            else:
+                self.failures = 0
+
+    def on_failure(self, now=None):
+        """Record a failed call; returns True if this failure tripped the breaker"""
+        with self._lock:
+            now = time.monotonic() if now is None else now
+            self.last_failure_time = now
+            if self.state == HALF_OPEN:
+                self.half_open_inflight = max(0, self.half_open_inflight - 1)
+                self._trip(now)
+                return True
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._trip(now)
+                return True
+            return False
+
+    def force_close(self):
+        """Reset the breaker to CLOSED regardless of its current state"""
+        with self._lock:
+            self._close()
+
+    def _set_state(self, state):
+        old_state = self.state
+        if state != old_state:
+            self.state = state
+            if self.on_state_change is not None:
+                self.on_state_change(self, old_state, state)
+
+    def _trip(self, now):
+        self._set_state(OPEN)
+        self.successes = 0
+        self.next_attempt = now + self.reset_timeout
+
+    def _close(self):
+        self._set_state(CLOSED)
+        self.failures = 0
+        self.successes = 0
+        self.half_open_inflight = 0
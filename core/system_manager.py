@@ -1,9 +1,15 @@
 import os
+import re
+import hashlib
 import logging
+import queue
 import threading
 import time
+from collections import Counter, deque
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from core.circuit_breaker import CircuitBreaker, OPEN
+
 from agents.test_generator import TestGenerator
 from agents.tester import Tester
 from agents.fixer import Fixer
@@ -13,6 +19,14 @@ from agents.user_interface import UserInterface
 
 from memory.memory_manager import MemoryManager
 
+# First exception class name in a failure reason, used as its failure mode
+_EXCEPTION_NAME_RE = re.compile(r"\b([A-Z]\w*(?:Error|Exception))\b")
+
+# Variable parts stripped from error messages by _get_error_signature
+_LINE_NUMBER_RE = re.compile(r'line \d+')
+_FILE_PATH_RE = re.compile(r'File ".*?"')
+_HEX_ID_RE = re.compile(r'0x[0-9a-fA-F]+')
+
 class SystemManager(QObject):
     status_update = pyqtSignal(str)
     log_message = pyqtSignal(str)
@@ -28,17 +42,37 @@ class SystemManager(QObject):
         self.running = False
         self.paused = False
         self.thread = None
+        # Cleared while paused; the main loop blocks on it instead of polling
+        self._run_event = threading.Event()
+        self._run_event.set()
+        # Cycle results are written to disk by a background writer thread
+        self._persist_q = queue.Queue(maxsize=128)
+        self._persist_thread = None
         self.model_name = 'qwen3:30b'
         
         # Track recent LLM outputs and test results
-        self.recent_llm_outputs = []
         self.max_llm_outputs = 10
+        self.llm_preview_chars = 500  # Longest LLM response preview shown in the UI
+        self.llm_emit_interval = 0.05  # Emit LLM output to the GUI at most ~20 times a second
+        self._last_llm_emit = 0.0
+        self._pending_llm_emit = None  # Latest (agent, prompt, response) preview held back by the throttle
+        self.recent_llm_outputs = deque(maxlen=self.max_llm_outputs)
         self.last_test = None
         self.last_test_result = None
         
+        # get_system_status() reuses its last result until something it reports changes
+        self._status_version = 0
+        self._status_cache = None  # (version, built_at, status)
+        self.status_cache_ttl = 2.0  # Upper bound on staleness of agent statuses, in seconds
+        
         # Error tracking and self-healing
         self.error_history = {}  # Track recurring errors
+        self.error_counts = Counter()  # Error type -> count, mirrors error_history[...]["count"]
         self.recovery_strategies = {}  # Store successful recovery strategies
+        self._fix_cache = {}  # Hashed (test identity, failure signature) -> last successful fix for it
+        self._recovery_by_mode = {}  # (test identity, failure mode) -> last successful fix for that mode
+        self.failure_mode_counts = Counter()  # Failures seen per failure mode
+        self.recovery_mode_threshold = 3  # Recurrences of a mode before its recovery fix is reused
         self.last_error_time = time.time()
         self.consecutive_error_cycles = 0
         self.max_error_cycles = 10  # Max consecutive error cycles before taking action
@@ -63,16 +97,31 @@ class SystemManager(QObject):
             self.monitor,
             self.user_interface
         ]
+        self._agent_names = frozenset(agent.name for agent in self.agents)
+        self._agents_by_name = {agent.name: agent for agent in self.agents}
         
         # Fault tolerance settings
         self.max_agent_failures = 3  # Maximum consecutive failures before circuit breaker trips
-        self.agent_failure_counts = {agent.name: 0 for agent in self.agents}
-        self.circuit_breakers = {agent.name: False for agent in self.agents}
-        self.circuit_breaker_reset_time = 300  # 5 minutes to reset a circuit breaker
-        self.last_failure_time = {agent.name: 0 for agent in self.agents}
+        self.circuit_breaker_reset_time = 300  # 5 minutes before a tripped breaker admits probe calls
+        self._open_breaker_count = 0  # Kept in step with breaker transitions
+        self._breaker_count_lock = threading.Lock()
+        self.breakers = {
+            agent.name: CircuitBreaker(agent.name,
+                                       failure_threshold=self.max_agent_failures,
+                                       reset_timeout=self.circuit_breaker_reset_time,
+                                       on_state_change=self._on_breaker_state_change)
+            for agent in self.agents
+        }
         
         # Track fixed tests over time (persists between app restarts)
         self.fixed_tests_count = 0
+        
+        # Fixed-test stats and error history are saved at most this often; the rest is flushed per cycle
+        self.stats_save_interval = 5.0
+        self._fixed_dirty = False
+        self._last_fixed_save = 0.0
+        self._error_history_dirty = False
+        self._last_error_history_save = 0.0
         self._load_fixed_tests_stats()
         
         # Load previous error history and recovery strategies
@@ -92,22 +141,44 @@ class SystemManager(QObject):
     
     def _on_llm_response(self, agent_name, prompt, response):
         """Callback for LLM responses"""
+        # Only previews are kept; the full texts stay with the agent that made the call
+        short_prompt = prompt[:100]
+        response_len = len(response)
         llm_data = {
             'agent': agent_name,
             'timestamp': time.time(),
-            'prompt': prompt,
-            'response': response
+            'prompt': short_prompt,
+            # Pre-truncated the way the stats panel displays it
+            'response': response if response_len <= self.llm_preview_chars else response[:self.llm_preview_chars - 3] + "...",
+            'response_len': response_len
         }
         
-        # Add to recent outputs
+        # Add to recent outputs (the deque drops the oldest once full)
         self.recent_llm_outputs.append(llm_data)
-        
-        # Keep only the most recent outputs
-        if len(self.recent_llm_outputs) > self.max_llm_outputs:
-            self.recent_llm_outputs = self.recent_llm_outputs[-self.max_llm_outputs:]
-        
-        # Emit signal with the response
-        self.llm_output_update.emit(f"Agent: {agent_name}\nPrompt: {prompt[:100]}...\nResponse: {response[:300]}...")
+        self._invalidate_status()
+        
+        # Emit signal with the response, coalescing bursts; a held-back preview is flushed per cycle
+        preview = (agent_name, short_prompt, response[:300])
+        now = time.monotonic()
+        if now - self._last_llm_emit >= self.llm_emit_interval:
+            self._last_llm_emit = now
+            self._pending_llm_emit = None
+            self._emit_llm_output(preview)
+        else:
+            self._pending_llm_emit = preview
+    
+    def _emit_llm_output(self, preview):
+        """Send an (agent, prompt, response) preview to the GUI"""
+        agent_name, prompt, response = preview
+        self.llm_output_update.emit(f"Agent: {agent_name}\nPrompt: {prompt}...\nResponse: {response}...")
+    
+    def _flush_llm_output(self):
+        """Emit the LLM preview held back by the throttle, if any"""
+        preview = self._pending_llm_emit
+        if preview is not None:
+            self._pending_llm_emit = None
+            self._last_llm_emit = time.monotonic()
+            self._emit_llm_output(preview)
     
     def start(self):
         """Start the system in a background thread"""
@@ -116,9 +187,14 @@ class SystemManager(QObject):
             
         self.running = True
         self.paused = False
+        self._run_event.set()
         self.thread = threading.Thread(target=self._run_system)
         self.thread.daemon = True
         self.thread.start()
+        if self._persist_thread is None or not self._persist_thread.is_alive():
+            self._persist_thread = threading.Thread(target=self._persist_worker, name="cycle-writer", daemon=True)
+            self._persist_thread.start()
+        self._invalidate_status()
         self.status_update.emit("System started")
         self.logger.info("System started in background thread")
     
@@ -128,6 +204,8 @@ class SystemManager(QObject):
             return
             
         self.paused = True
+        self._run_event.clear()
+        self._invalidate_status()
         self.status_update.emit("System paused")
         self.logger.info("System paused")
     
@@ -137,6 +215,8 @@ class SystemManager(QObject):
             return
             
         self.paused = False
+        self._run_event.set()
+        self._invalidate_status()
         self.status_update.emit("System resumed")
         self.logger.info("System resumed")
     
@@ -147,7 +227,16 @@ class SystemManager(QObject):
             
         self.running = False
         self.paused = False
+        self._run_event.set()  # Wake the loop if it is paused so it can exit
+        # The loop stops the cycle writer itself once its last results are queued,
+        # so a cycle still mid-LLM-call when this join times out is saved later
         self.thread.join(timeout=5.0)
+        self._flush_stats()
+        self._invalidate_status()
+        self.tester.shutdown()
+        self.user_interface.shutdown()
+        # Last, so the action logs and knowledge the agents hand over on shutdown reach disk
+        self.memory.flush()
         self.status_update.emit("System stopped")
         self.logger.info("System stopped")
     
@@ -163,18 +252,18 @@ class SystemManager(QObject):
             
             cycle_count = 0
             while self.running:
-                # Check if paused
-                if self.paused:
-                    time.sleep(0.5)  # Short sleep when paused to prevent CPU spinning
-                    continue
+                # Block while paused; resume() and stop() set the event
+                self._run_event.wait()
+                if not self.running:
+                    break
                     
                 cycle_count += 1
                 self.status_update.emit(f"Cycle {cycle_count}")
-                self.logger.info(f"Starting cycle {cycle_count}")
+                self.logger.info("Starting cycle %d", cycle_count)
                 
                 # Self-healing: Check if we're stuck in error cycles
                 if self.consecutive_error_cycles >= self.max_error_cycles:
-                    self.logger.warning(f"Detected {self.consecutive_error_cycles} consecutive error cycles. Initiating self-healing.")
+                    self.logger.warning("Detected %d consecutive error cycles. Initiating self-healing.", self.consecutive_error_cycles)
                     self._perform_self_healing()
                     self.consecutive_error_cycles = 0
                 
@@ -182,26 +271,19 @@ class SystemManager(QObject):
                 health_status = self.safe_execute(self.monitor, "check_health")
                 if not health_status or not health_status.get('healthy', False):
                     health_issues = health_status.get('issues', []) if health_status else ["Unknown health issues"]
-                    # Extract message from each health issue (which are dictionaries)
-                    issues_messages = []
-                    for issue in health_issues:
-                        if isinstance(issue, dict):
-                            # Extract the message or description from the issue dictionary
-                            msg = issue.get('message', issue.get('description', str(issue)))
-                            issues_messages.append(msg)
-                        else:
-                            # If it's already a string, just add it
-                            issues_messages.append(str(issue))
-                    
-                    issues_message = "; ".join(issues_messages) if issues_messages else "Unknown issues"
+                    # Health issues are dicts carrying a message (or description); anything else is stringified
+                    issues_message = "; ".join(
+                        (issue.get('message') or issue.get('description') or str(issue)) if isinstance(issue, dict) else str(issue)
+                        for issue in health_issues
+                    ) or "Unknown issues"
                     self.log_message.emit(f"Health check failed: {issues_message}")
-                    self.logger.warning(f"Health check failed: {issues_message}")
+                    self.logger.warning("Health check failed: %s", issues_message)
                     
                     # Track health check failures
                     self.health_check_failures += 1
                     if self.health_check_failures > 5:
                         # If too many health check failures, reset circuit breakers
-                        self.logger.warning(f"Detected {self.health_check_failures} consecutive health check failures. Resetting circuit breakers.")
+                        self.logger.warning("Detected %d consecutive health check failures. Resetting circuit breakers.", self.health_check_failures)
                         self.reset_circuit_breakers()
                         self.health_check_failures = 0
                     
@@ -217,35 +299,31 @@ class SystemManager(QObject):
                 
                 # Generate a single test incrementally
                 self.log_message.emit(f"Generating incremental test batch (size: {self.test_batch_size})")
-                try:
-                    new_tests = self.safe_execute(self.test_generator, "generate_tests", count=self.test_batch_size)
-                    
+                new_tests, ok = self._step(self.test_generator, "generate_tests", "test_generation_exception",
+                                           count=self.test_batch_size, fallback=[])
+                if ok:
                     # Check if test generation was successful
-                    if not new_tests or len(new_tests) == 0:
+                    if not new_tests:
                         self.logger.warning("Test generation failed to produce any tests")
                         self._record_error("test_generation_failure", "No tests generated")
                         self.consecutive_error_cycles += 1
                     else:
                         # Test generation succeeded, reset error cycle counter
                         self.consecutive_error_cycles = 0
-                except Exception as e:
-                    self.logger.error(f"Error in test generation: {str(e)}")
-                    self._record_error("test_generation_exception", str(e))
-                    self.consecutive_error_cycles += 1
-                    new_tests = []
                 
                 # Update last test information
-                if new_tests and len(new_tests) > 0:
-                    self.last_test = new_tests[0]
+                if new_tests:
+                    first_test = self.last_test = new_tests[0]
+                    self._invalidate_status()
                     self.test_update.emit({
                         'cycle_count': cycle_count,
-                        'last_test': self.last_test,
+                        'last_test': first_test,
                         'result': None
                     })
                     
                     # Add artificial learning update about test generation
-                    test_name = self.last_test.get('name', f"Test {self.last_test.get('id', 'unknown')}")
-                    test_type = self.last_test.get('type', 'unknown')
+                    test_name = first_test.get('name', f"Test {first_test.get('id', 'unknown')}")
+                    test_type = first_test.get('type', 'unknown')
                     self._emit_sample_learning_update("test_generation", 
                                                     f"Created new {test_type} test: {test_name}")
                 
@@ -253,41 +331,36 @@ class SystemManager(QObject):
                 time.sleep(1)
                 
                 # Run tests if any were generated
-                if new_tests and len(new_tests) > 0:
+                if new_tests:
                     self.log_message.emit("Running incremental test batch")
-                    try:
-                        test_results = self.safe_execute(self.tester, "run_tests", new_tests)
-                        
+                    test_results, ok = self._step(self.tester, "run_tests", "test_execution_exception",
+                                                  new_tests, fallback=[])
+                    if ok:
                         # Check if test execution was successful
-                        if not test_results or len(test_results) == 0:
+                        if not test_results:
                             self.logger.warning("Test execution failed to produce any results")
                             self._record_error("test_execution_failure", "No test results generated")
                             self.consecutive_error_cycles += 1
                         else:
                             # Test execution succeeded, reset error cycle counter
                             self.consecutive_error_cycles = 0
-                    except Exception as e:
-                        self.logger.error(f"Error in test execution: {str(e)}")
-                        self._record_error("test_execution_exception", str(e))
-                        self.consecutive_error_cycles += 1
-                        test_results = []
                     
                     # Update last test result
-                    if test_results and len(test_results) > 0:
-                        self.last_test_result = test_results[0]
+                    if test_results:
+                        first_result = self.last_test_result = test_results[0]
+                        self._invalidate_status()
                         self.test_update.emit({
                             'cycle_count': cycle_count,
-                            'last_test': self.last_test,
-                            'result': self.last_test_result
+                            'last_test': first_test,
+                            'result': first_result
                         })
                         
                         # Add artificial learning update about test results
-                        passed = self.last_test_result.get('passed', False)
-                        if passed:
+                        if first_result.get('passed', False):
                             self._emit_sample_learning_update("test_success", 
                                                             f"Test passed successfully. Analyzing patterns for future tests.")
                         else:
-                            failure = self.last_test_result.get('failure_reason', 'Unknown failure')
+                            failure = first_result.get('failure_reason', 'Unknown failure')
                             self._emit_sample_learning_update("test_failure", 
                                                             f"Test failed with reason: {failure[:100]}... Analyzing error patterns.")
                     
@@ -301,92 +374,85 @@ class SystemManager(QObject):
                         # NEW: Keep trying to fix failed tests until they're all fixed or max attempts reached
                         max_fix_attempts = 5  # Maximum number of fix attempts per test
                         fix_attempt = 0
-                        still_failing = test_results
-                        fixes = []
                         
-                        while fix_attempt < max_fix_attempts:
+                        # Re-apply cached fixes for known failures before asking the LLM
+                        fixes, still_failing = self._apply_cached_fixes(test_results)
+                        
+                        while still_failing and fix_attempt < max_fix_attempts:
                             fix_attempt += 1
-                            self.log_message.emit(f"Fix attempt {fix_attempt}/{max_fix_attempts}")
-                            self.logger.info(f"Fix attempt {fix_attempt}/{max_fix_attempts} for {len(still_failing)} failed tests")
+                            # Progress lines for this attempt go out as one console message
+                            attempt_log = [f"Fix attempt {fix_attempt}/{max_fix_attempts}"]
+                            self.logger.info("Fix attempt %d/%d for %d failed tests", fix_attempt, max_fix_attempts, len(still_failing))
                             
                             # Try to fix the failing tests
-                            try:
-                                new_fixes = self.safe_execute(self.fixer, "fix_issues", still_failing)
-                                if new_fixes:
-                                    fixes.extend(new_fixes)
+                            new_fixes, ok = self._step(self.fixer, "fix_issues", "fix_exception", still_failing)
+                            if not ok:
+                                self.log_message.emit("\n".join(attempt_log))
+                                continue
+                            if new_fixes:
+                                fixes.extend(new_fixes)
+                            
+                            # Check if any fixes were successful
+                            successful_fixes = [f for f in new_fixes if f.get('success', False)] if new_fixes else []
+                            
+                            if successful_fixes:
+                                attempt_log.append(f"Successfully fixed {len(successful_fixes)} tests on attempt {fix_attempt}")
                                 
-                                # Check if any fixes were successful
-                                successful_fixes = [f for f in new_fixes if f.get('success', False)] if new_fixes else []
+                                # Record successful fix strategies
+                                failure_by_id = {r.get('test_id'): r.get('failure_reason') for r in still_failing}
+                                for fix in successful_fixes:
+                                    test_id = fix.get('test_id')
+                                    if test_id:
+                                        # Find the original failure
+                                        original_failure = failure_by_id.get(test_id)
+                                        if original_failure:
+                                            # Record the successful fix strategy
+                                            self._record_successful_fix(original_failure, fix)
+                            else:
+                                attempt_log.append(f"No successful fixes on attempt {fix_attempt}")
                                 
-                                if successful_fixes:
-                                    self.log_message.emit(f"Successfully fixed {len(successful_fixes)} tests on attempt {fix_attempt}")
-                                    
-                                    # Record successful fix strategies
-                                    for fix in successful_fixes:
-                                        test_id = fix.get('test_id')
-                                        if test_id:
-                                            # Find the original failure
-                                            original_failure = next((r.get('failure_reason') for r in still_failing if r.get('test_id') == test_id), None)
-                                            if original_failure:
-                                                # Record the successful fix strategy
-                                                self._record_successful_fix(original_failure, fix)
-                                else:
-                                    self.log_message.emit(f"No successful fixes on attempt {fix_attempt}")
-                                    
-                                    # Record the fix failure
-                                    for failed_test in still_failing:
-                                        self._record_error("fix_failure", f"Failed to fix test {failed_test.get('test_id')}: {failed_test.get('failure_reason')}")
+                                # Record the fix failure
+                                for failed_test in still_failing:
+                                    self._record_error("fix_failure", f"Failed to fix test {failed_test.get('test_id')}: {failed_test.get('failure_reason')}")
+                            
+                            # If all tests were fixed or we've reached max attempts, break
+                            if successful_fixes and len(successful_fixes) == len(still_failing):
+                                attempt_log.append("All tests fixed successfully!")
+                                self.log_message.emit("\n".join(attempt_log))
+                                break
+                                
+                            # Re-run the still-failing tests to see if they're fixed
+                            fixed_test_ids = {f.get('test_id') for f in successful_fixes}
+                            still_failing = [r for r in still_failing if r.get('test_id') not in fixed_test_ids]
+                            self.log_message.emit("\n".join(attempt_log))
+                            
+                            # If no more failing tests, we're done
+                            if not still_failing:
+                                break
                                 
-                                # If all tests were fixed or we've reached max attempts, break
-                                if successful_fixes and len(successful_fixes) == len(still_failing):
-                                    self.log_message.emit("All tests fixed successfully!")
-                                    break
-                                    
-                                # Re-run the still-failing tests to see if they're fixed
-                                fixed_test_ids = [f.get('test_id') for f in successful_fixes]
-                                still_failing = [r for r in still_failing if r.get('test_id') not in fixed_test_ids]
+                            # If we've reached max attempts, log that we're giving up
+                            if fix_attempt >= max_fix_attempts:
+                                self.log_message.emit(f"Giving up after {max_fix_attempts} attempts to fix {len(still_failing)} tests")
+                                self.logger.warning("Giving up after %d attempts to fix %d tests", max_fix_attempts, len(still_failing))
                                 
-                                # If no more failing tests, we're done
-                                if not still_failing:
-                                    break
-                                    
-                                # If we've reached max attempts, log that we're giving up
-                                if fix_attempt >= max_fix_attempts:
-                                    self.log_message.emit(f"Giving up after {max_fix_attempts} attempts to fix {len(still_failing)} tests")
-                                    self.logger.warning(f"Giving up after {max_fix_attempts} attempts to fix {len(still_failing)} tests")
-                                    
-                                    # Record remaining failures for analysis
-                                    for failed_test in still_failing:
-                                        self._record_error("unfixable_test", f"Gave up on test {failed_test.get('test_id')}: {failed_test.get('failure_reason')}")
-                            except Exception as e:
-                                self.logger.error(f"Error during fix attempt {fix_attempt}: {str(e)}")
-                                self._record_error("fix_exception", str(e))
-                                self.consecutive_error_cycles += 1
+                                # Record remaining failures for analysis
+                                for failed_test in still_failing:
+                                    self._record_error("unfixable_test", f"Gave up on test {failed_test.get('test_id')}: {failed_test.get('failure_reason')}")
                         
                         # Learn from the fixes (successful or not)
                         self.log_message.emit("Learning from fixes")
-                        try:
-                            learning_result = self.safe_execute(self.learner, "learn_from_fixes", fixes)
-                            if not learning_result or not learning_result.get('success', False):
-                                self.logger.warning("Learning from fixes failed")
-                                self._record_error("learning_failure", "Failed to learn from fixes")
-                                self.consecutive_error_cycles += 1
-                        except Exception as e:
-                            self.logger.error(f"Error learning from fixes: {str(e)}")
-                            self._record_error("learning_exception", str(e))
+                        learning_result, ok = self._step(self.learner, "learn_from_fixes", "learning_exception", fixes)
+                        if ok and (not learning_result or not learning_result.get('success', False)):
+                            self.logger.warning("Learning from fixes failed")
+                            self._record_error("learning_failure", "Failed to learn from fixes")
                             self.consecutive_error_cycles += 1
                     else:
                         # Learn from successes
                         self.log_message.emit("Learning from successful tests")
-                        try:
-                            learning_result = self.safe_execute(self.learner, "learn_from_success", test_results)
-                            if not learning_result or not learning_result.get('success', False):
-                                self.logger.warning("Learning from successes failed")
-                                self._record_error("learning_failure", "Failed to learn from successes")
-                                self.consecutive_error_cycles += 1
-                        except Exception as e:
-                            self.logger.error(f"Error learning from successes: {str(e)}")
-                            self._record_error("learning_exception", str(e))
+                        learning_result, ok = self._step(self.learner, "learn_from_success", "learning_exception", test_results)
+                        if ok and (not learning_result or not learning_result.get('success', False)):
+                            self.logger.warning("Learning from successes failed")
+                            self._record_error("learning_failure", "Failed to learn from successes")
                             self.consecutive_error_cycles += 1
                 else:
                     # No tests to execute, increase error counter
@@ -397,17 +463,24 @@ class SystemManager(QObject):
                 # Process any user requests
                 self.safe_execute(self.user_interface, "process_pending_requests")
                 
-                # Save progress
-                self.memory.save_cycle_results(cycle_count, {
+                # Save progress in the background; fall back to a direct write if the writer is backed up
+                cycle_data = (cycle_count, {
                     'tests': new_tests,
                     'results': test_results
                 })
+                try:
+                    self._persist_q.put_nowait(cycle_data)
+                except queue.Full:
+                    self.memory.save_cycle_results(*cycle_data)
+                    self._invalidate_status()
+                self._flush_stats()
+                self._flush_llm_output()
                 
                 # Proceed immediately to the next cycle instead of waiting
                 self.log_message.emit(f"Cycle {cycle_count} completed. Starting next cycle...")
                 
         except Exception as e:
-            self.logger.error(f"System error: {str(e)}", exc_info=True)
+            self.logger.error("System error: %s", e, exc_info=True)
             self.status_update.emit(f"System error: {str(e)}")
             
             # Record the system error
@@ -415,15 +488,49 @@ class SystemManager(QObject):
         finally:
             self.running = False
             self.paused = False
+            self._stop_persist_worker()
+            self._invalidate_status()
             
+    def _step(self, agent, method_name, error_tag, *args, fallback=None, **kwargs):
+        """Run one agent step of the main loop through safe_execute
+        
+        Returns (result, ok). If the step raises, the error is recorded under error_tag,
+        counted as an error cycle, and (fallback, False) is returned.
+        """
+        try:
+            return self.safe_execute(agent, method_name, *args, **kwargs), True
+        except Exception as e:
+            self.logger.error("Error in %s.%s: %s", agent.name, method_name, e)
+            self._record_error(error_tag, str(e))
+            self.consecutive_error_cycles += 1
+            return fallback, False
+    
+    def _persist_worker(self):
+        """Write queued cycle results to memory until the None sentinel arrives"""
+        while True:
+            item = self._persist_q.get()
+            if item is None:
+                break
+            try:
+                self.memory.save_cycle_results(*item)
+                self._invalidate_status()  # cycle_count is read back from the saved cycles
+            except Exception as e:
+                self.logger.error("Error saving cycle %s results: %s", item[0], e)
+    
+    def _stop_persist_worker(self):
+        """Drain pending cycle results and stop the writer thread"""
+        if self._persist_thread is None:
+            return
+        self._persist_q.put(None)
+        self._persist_thread.join(timeout=5.0)
+        self._persist_thread = None
+    
     def _emit_sample_learning_update(self, concept_type, insight_text):
         """Emit a sample learning update for demonstration purposes"""
-        import datetime
-        
         # Create a learning update
         learning_item = {
             "type": f"{concept_type}_learning",
-            "timestamp": datetime.datetime.now().strftime("%H:%M:%S"),
+            "timestamp": time.strftime("%H:%M:%S"),
             "concept": concept_type,
             "insight": insight_text
         }
@@ -435,8 +542,23 @@ class SystemManager(QObject):
         """Process user input from the GUI"""
         return self.user_interface.process_prompt(prompt)
     
+    def submit_user_input(self, prompt):
+        """Process user input from the GUI without blocking; returns a Future of the response"""
+        return self.user_interface.submit_prompt(prompt)
+    
+    def _invalidate_status(self):
+        """Mark the cached system status as stale"""
+        self._status_version += 1
+    
     def get_system_status(self):
         """Get the current status of all system components"""
+        # Reuse the last status if nothing changed since it was built and it is still fresh
+        version = self._status_version
+        now = time.monotonic()
+        cached = self._status_cache
+        if cached is not None and cached[0] == version and now - cached[1] < self.status_cache_ttl:
+            return cached[2]
+        
         status = {
             'running': self.running,
             'paused': self.paused,
@@ -457,15 +579,15 @@ class SystemManager(QObject):
         
         for agent in self.agents:
             status['agents'][agent.name] = agent.get_status()
-            
+        
+        self._status_cache = (version, now, status)
         return status 
     
     def reset_circuit_breakers(self):
         """Reset all circuit breakers and failure counts"""
         self.logger.info("Manually resetting all circuit breakers")
-        for agent in self.agents:
-            self.circuit_breakers[agent.name] = False
-            self.agent_failure_counts[agent.name] = 0
+        for breaker in self.breakers.values():
+            breaker.force_close()
         return True
     
     def _load_fixed_tests_stats(self):
@@ -473,91 +595,86 @@ class SystemManager(QObject):
         stats = self.memory.get_knowledge("fixed_tests_stats")
         if stats:
             self.fixed_tests_count = stats.get("count", 0)
-            self.logger.info(f"Loaded fixed tests stats: {self.fixed_tests_count} tests fixed")
+            self.logger.info("Loaded fixed tests stats: %d tests fixed", self.fixed_tests_count)
             
     def _save_fixed_tests_stats(self):
         """Save fixed tests statistics to memory"""
+        self._fixed_dirty = False
+        self._last_fixed_save = time.monotonic()
         self.memory.save_knowledge("fixed_tests_stats", {
             "count": self.fixed_tests_count,
             "last_updated": time.time()
         })
-        self.logger.info(f"Saved fixed tests stats: {self.fixed_tests_count} tests fixed")
+        self.logger.info("Saved fixed tests stats: %d tests fixed", self.fixed_tests_count)
     
     def _on_test_fixed(self, test_event):
         """Called when a test is successfully fixed"""
         self.fixed_tests_count += 1
-        self.logger.info(f"Test fixed event received. Total fixed tests: {self.fixed_tests_count}")
-        self._save_fixed_tests_stats()
+        self._invalidate_status()
+        self.logger.info("Test fixed event received. Total fixed tests: %d", self.fixed_tests_count)
+        
+        # Coalesce bursts of fixes; anything unsaved is flushed at the end of the cycle
+        self._fixed_dirty = True
+        if time.monotonic() - self._last_fixed_save > self.stats_save_interval:
+            self._save_fixed_tests_stats()
+    
+    def _flush_stats(self):
+        """Save fixed-test stats and error history if they changed since the last save"""
+        if self._fixed_dirty:
+            self._save_fixed_tests_stats()
+        if self._error_history_dirty:
+            self._save_error_history()
+    
+    def _on_breaker_state_change(self, breaker, old_state, new_state):
+        """Track how many circuit breakers are open"""
+        with self._breaker_count_lock:
+            if new_state == OPEN:
+                self._open_breaker_count += 1
+            elif old_state == OPEN:
+                self._open_breaker_count -= 1
     
     def safe_execute(self, agent, method_name, *args, **kwargs):
         """Safely execute an agent method with fault tolerance and circuit breaker pattern"""
         agent_name = agent.name
         
-        # Check if circuit breaker is tripped
-        if self.circuit_breakers.get(agent_name, False):
-            # Check if enough time has passed to reset circuit breaker
-            current_time = time.time()
-            if current_time - self.last_failure_time.get(agent_name, 0) > self.circuit_breaker_reset_time:
-                # Reset circuit breaker
-                self.circuit_breakers[agent_name] = False
-                self.agent_failure_counts[agent_name] = 0
-                self.logger.info(f"Circuit breaker reset for agent {agent_name}")
-            else:
-                # Circuit breaker still active, skip execution
-                self.logger.warning(f"Circuit breaker active for agent {agent_name}, skipping execution")
-                
-                # If all agents have circuit breakers tripped for a long time, force reset them
-                all_breakers_active = all(self.circuit_breakers.get(a.name, False) for a in self.agents)
-                if all_breakers_active:
-                    self.logger.warning("All circuit breakers active, forcing reset for all agents")
-                    for a in self.agents:
-                        self.circuit_breakers[a.name] = False
-                        self.agent_failure_counts[a.name] = 0
-                    return None
-                
-                # Force reset specific agents after much longer time (15 minutes)
-                force_reset_time = 15 * 60  # 15 minutes in seconds
-                if current_time - self.last_failure_time.get(agent_name, 0) > force_reset_time:
-                    self.logger.warning(f"Force resetting circuit breaker for agent {agent_name} after extended period")
-                    self.circuit_breakers[agent_name] = False
-                    self.agent_failure_counts[agent_name] = 0
-                    # Continue with execution
-                else:
-                    return None
+        # Get the method to execute
+        method = getattr(agent, method_name, None)
+        if not method:
+            self.logger.error("Method %s not found in agent %s", method_name, agent_name)
+            self._record_error("missing_method", f"{agent_name}.{method_name}")
+            return None
+        
+        # Check the circuit breaker (OPEN rejects, HALF_OPEN admits a limited number of probes)
+        breaker = self.breakers[agent_name]
+        if not breaker.can_execute():
+            self.logger.warning("Circuit breaker active for agent %s, skipping execution", agent_name)
+            
+            # If all agents have circuit breakers tripped, force reset them
+            if self._open_breaker_count == len(self.breakers):
+                self.logger.warning("All circuit breakers active, forcing reset for all agents")
+                self.reset_circuit_breakers()
+            return None
         
         # Execute the method with fault tolerance
         try:
-            # Get the method to execute
-            method = getattr(agent, method_name, None)
-            if not method:
-                self.logger.error(f"Method {method_name} not found in agent {agent_name}")
-                self._record_error("missing_method", f"{agent_name}.{method_name}")
-                return None
-                
-            # Execute the method
-            self.logger.info(f"Executing {method_name} on agent {agent_name}")
+            self.logger.info("Executing %s on agent %s", method_name, agent_name)
             result = method(*args, **kwargs)
             
-            # Reset failure count on success
-            self.agent_failure_counts[agent_name] = 0
+            # Count the success (closes a HALF_OPEN breaker once enough probes pass)
+            breaker.on_success()
             
             return result
             
         except Exception as e:
             # Log the error
-            self.logger.error(f"Error executing {method_name} on agent {agent_name}: {str(e)}", exc_info=True)
+            self.logger.error("Error executing %s on agent %s: %s", method_name, agent_name, e, exc_info=True)
             
             # Record the error
             self._record_error(f"{agent_name}_{method_name}_error", str(e))
             
-            # Increment failure count
-            self.agent_failure_counts[agent_name] = self.agent_failure_counts.get(agent_name, 0) + 1
-            self.last_failure_time[agent_name] = time.time()
-            
-            # Check if circuit breaker should trip
-            if self.agent_failure_counts.get(agent_name, 0) >= self.max_agent_failures:
-                self.circuit_breakers[agent_name] = True
-                self.logger.warning(f"Circuit breaker tripped for agent {agent_name} after {self.max_agent_failures} failures")
+            # Count the failure (trips the breaker, or re-opens it if this was a probe)
+            if breaker.on_failure():
+                self.logger.warning("Circuit breaker tripped for agent %s after %d failures", agent_name, breaker.failures)
                 
             # Return fallback result
             return kwargs.get("fallback_result", None)
@@ -574,24 +691,22 @@ class SystemManager(QObject):
         most_common_error = self._get_most_common_error()
         if most_common_error:
             error_type, error_details = most_common_error
-            self.logger.info(f"Most common error: {error_type} - {error_details[:100]}...")
+            self.logger.info("Most common error: %s - %.100s...", error_type, error_details)
             
             # Apply known recovery strategies
             if error_type in self.recovery_strategies:
                 strategy = self.recovery_strategies[error_type]
-                self.logger.info(f"Applying recovery strategy for {error_type}: {strategy.get('description', 'No description')}")
+                self.logger.info("Applying recovery strategy for %s: %s", error_type, strategy.get('description', 'No description'))
                 
                 # Apply the strategy
                 if strategy.get('action') == 'reset_agent':
                     agent_name = strategy.get('agent_name')
-                    if agent_name and agent_name in [a.name for a in self.agents]:
-                        agent = next((a for a in self.agents if a.name == agent_name), None)
-                        if agent:
-                            self.logger.info(f"Reinitializing agent: {agent_name}")
-                            self.safe_execute(agent, "initialize")
+                    if agent_name in self._agent_names:
+                        self.logger.info("Reinitializing agent: %s", agent_name)
+                        self.safe_execute(self._agents_by_name[agent_name], "initialize")
                 elif strategy.get('action') == 'change_model':
                     new_model = strategy.get('model_name', 'qwen3:30b')
-                    self.logger.info(f"Changing model to: {new_model}")
+                    self.logger.info("Changing model to: %s", new_model)
                     self.model_name = new_model
                     for agent in self.agents:
                         agent.model_name = new_model
@@ -626,8 +741,9 @@ class SystemManager(QObject):
         current_time = time.time()
         
         # Initialize error type if not exists
-        if error_type not in self.error_history:
-            self.error_history[error_type] = {
+        entry = self.error_history.get(error_type)
+        if entry is None:
+            entry = self.error_history[error_type] = {
                 "count": 0,
                 "first_seen": current_time,
                 "last_seen": current_time,
@@ -636,29 +752,124 @@ class SystemManager(QObject):
             }
         
         # Update error stats
-        self.error_history[error_type]["count"] += 1
-        self.error_history[error_type]["last_seen"] = current_time
-        self.error_history[error_type]["details"] = details  # Update with latest details
-        
-        # Keep last 10 occurrences with timestamps
-        self.error_history[error_type]["occurrences"].append({
+        self.error_counts[error_type] += 1
+        entry["count"] = self.error_counts[error_type]
+        entry["last_seen"] = current_time
+        entry["details"] = details  # Update with latest details
+        
+        # Keep last 10 occurrences with timestamps (trimmed in place)
+        occurrences = entry["occurrences"]
+        occurrences.append({
             "timestamp": current_time,
             "details": details
         })
-        if len(self.error_history[error_type]["occurrences"]) > 10:
-            self.error_history[error_type]["occurrences"] = self.error_history[error_type]["occurrences"][-10:]
+        if len(occurrences) > 10:
+            del occurrences[:-10]
         
-        # Save error history to memory
-        self.memory.save_knowledge("error_history", self.error_history)
+        # Save error history to memory, at most once per save interval
+        self._error_history_dirty = True
+        if time.monotonic() - self._last_error_history_save > self.stats_save_interval:
+            self._save_error_history()
         
         # Log the error
-        self.logger.warning(f"Recorded error: {error_type} - {details[:100]}...")
+        self.logger.warning("Recorded error: %s - %.100s...", error_type, details)
+    
+    def _test_identity(self, test_id):
+        """Identify a test by a hash of its code, falling back to its id, so cached fixes stay with that test"""
+        tests = self.memory.test_history.get("tests", [])
+        test = tests[test_id] if isinstance(test_id, int) and 0 <= test_id < len(tests) else None
+        code = test.get("code") if test else None
+        if not code:
+            return f"id:{test_id}"
+        return "code:" + hashlib.blake2b(str(code).encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _fix_cache_key(self, failure, test_id):
+        """Hash the failing test's identity and normalized failure reason into a fix cache key"""
+        key = f"{self._test_identity(test_id)}\0{self._get_error_signature(failure)}"
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _get_failure_mode(self, failure):
+        """Classify a failure reason by its exception class, or its first 40 normalized chars"""
+        signature = self._get_error_signature(failure)
+        match = _EXCEPTION_NAME_RE.search(signature)
+        return match.group(1) if match else signature[:40]
+    
+    def _match_recovery(self, test_results):
+        """Split results into (hits, remainder) using the fix cache and recovery memory
+        
+        Each hit is (result, fix, source) where source is "exact" for a cached fix of the same
+        failure or "mode" for a fix recorded under the same failure mode. Both only match fixes
+        of the same test. Mode matches are only used once that mode has failed
+        recovery_mode_threshold times.
+        """
+        hits = []
+        remainder = []
+        for result in test_results:
+            if result.get('passed', False):
+                remainder.append(result)
+                continue
+            
+            failure = result.get('failure_reason', '')
+            fix = self._fix_cache.get(self._fix_cache_key(failure, result.get('test_id')))
+            if fix:
+                hits.append((result, fix, "exact"))
+                continue
+            
+            mode = self._get_failure_mode(failure)
+            self.failure_mode_counts[mode] += 1
+            fix = self._recovery_by_mode.get((self._test_identity(result.get('test_id')), mode))
+            if fix and self.failure_mode_counts[mode] >= self.recovery_mode_threshold:
+                hits.append((result, fix, "mode"))
+            else:
+                remainder.append(result)
+        return hits, remainder
+    
+    def _apply_cached_fixes(self, test_results):
+        """Apply remembered fixes to known failures; returns (fixes, results still failing)"""
+        hits, remaining = self._match_recovery(test_results)
+        if not hits:
+            return [], remaining
+        
+        fixes = []
+        fix_results = self.safe_execute(self.fixer, "apply_cached_fixes", [(r, f) for r, f, _ in hits]) or [None] * len(hits)
+        for (result, fix, source), fix_result in zip(hits, fix_results):
+            failure = result.get('failure_reason', '')
+            if fix_result and fix_result.get('success', False):
+                fixes.append(fix_result)
+                self._record_successful_fix(failure, fix_result)
+            else:
+                # Stale entry: forget it and let the fixer handle this failure
+                if source == "exact":
+                    self._fix_cache.pop(self._fix_cache_key(failure, result.get('test_id')), None)
+                else:
+                    self._recovery_by_mode.pop((self._test_identity(result.get('test_id')), self._get_failure_mode(failure)), None)
+                if fix_result:
+                    fixes.append(fix_result)
+                remaining.append(result)
+        
+        if fixes:
+            self.log_message.emit(f"Applied {len(fixes)} cached fixes without an LLM round-trip")
+        return fixes, remaining
+    
+    def clear_fix_cache(self, failure=None, test_id=None):
+        """Forget the cached fix for one test's failure reason, or all cached fixes"""
+        if failure is None:
+            self._fix_cache.clear()
+            self._recovery_by_mode.clear()
+        else:
+            self._fix_cache.pop(self._fix_cache_key(failure, test_id), None)
+            self._recovery_by_mode.pop((self._test_identity(test_id), self._get_failure_mode(failure)), None)
     
     def _record_successful_fix(self, failure, fix):
         """Record a successful fix strategy for future use"""
         failure_signature = self._get_error_signature(failure)
         fix_type = fix.get('fix_type', 'unknown')
         
+        # Cache the fix so the same failure (or, once recurring, the same failure mode) can skip the LLM
+        if fix.get('fixed_code'):
+            self._fix_cache[self._fix_cache_key(failure, fix.get('test_id'))] = fix
+            self._recovery_by_mode[(self._test_identity(fix.get('test_id')), self._get_failure_mode(failure))] = fix
+        
         # Create or update the recovery strategy
         if failure_signature not in self.recovery_strategies:
             self.recovery_strategies[failure_signature] = {
@@ -681,45 +892,42 @@ class SystemManager(QObject):
         self.memory.save_knowledge("recovery_strategies", self.recovery_strategies)
         
         # Log the recovery strategy
-        self.logger.info(f"Recorded successful fix strategy for: {failure_signature}")
+        self.logger.info("Recorded successful fix strategy for: %s", failure_signature)
     
     def _get_error_signature(self, error_message):
         """Extract a unique signature from an error message for matching"""
-        # Strip variable parts like line numbers and object IDs
-        import re
-        
-        # Remove line numbers
-        signature = re.sub(r'line \d+', 'line XXX', str(error_message))
-        
-        # Remove specific file paths
-        signature = re.sub(r'File ".*?"', 'File "XXX"', signature)
-        
-        # Remove hex object IDs
-        signature = re.sub(r'0x[0-9a-fA-F]+', '0xXXX', signature)
+        # Strip variable parts: line numbers, specific file paths and hex object IDs
+        signature = _LINE_NUMBER_RE.sub('line XXX', str(error_message))
+        signature = _FILE_PATH_RE.sub('File "XXX"', signature)
+        signature = _HEX_ID_RE.sub('0xXXX', signature)
         
         # Keep only the first 100 chars to make it manageable
-        if len(signature) > 100:
-            signature = signature[:100]
-            
-        return signature
+        return signature[:100]
     
     def _get_most_common_error(self):
         """Get the most common error type and its details"""
-        if not self.error_history:
+        if not self.error_counts:
             return None
             
         # Find the error type with the highest count
-        most_common = max(self.error_history.items(), key=lambda x: x[1]["count"])
-        return (most_common[0], most_common[1]["details"])
+        error_type = self.error_counts.most_common(1)[0][0]
+        return (error_type, self.error_history[error_type]["details"])
+    
+    def _save_error_history(self):
+        """Save error history to memory"""
+        self._error_history_dirty = False
+        self._last_error_history_save = time.monotonic()
+        self.memory.save_knowledge("error_history", self.error_history)
     
     def _load_error_history(self):
         """Load error history and recovery strategies from memory"""
         error_history = self.memory.get_knowledge("error_history")
         if error_history:
             self.error_history = error_history
-            self.logger.info(f"Loaded error history with {len(error_history)} error types")
+            self.error_counts = Counter({error_type: entry.get("count", 0) for error_type, entry in error_history.items()})
+            self.logger.info("Loaded error history with %d error types", len(error_history))
         
         recovery_strategies = self.memory.get_knowledge("recovery_strategies")
         if recovery_strategies:
             self.recovery_strategies = recovery_strategies
-            self.logger.info(f"Loaded {len(recovery_strategies)} recovery strategies") 
\ No newline at end of file
+            self.logger.info("Loaded %d recovery strategies", len(recovery_strategies)) 
\ No newline at end of file
@@ -1,10 +1,14 @@
 import os
-import json
+import atexit
 import logging
 import time
 import shutil
+import threading
+import tempfile
 from datetime import datetime
 
+from utils import json_utils
+
 class MemoryManager:
     def __init__(self, config):
         self.logger = logging.getLogger(__name__)
@@ -16,9 +20,30 @@ class MemoryManager:
         
         # Initialize memory caches
         self.action_logs = []
+        self.action_log_max_bytes = 64 * 1024 * 1024  # Roll actions.ndjson over at this size
         self.knowledge_base = self._load_knowledge_base()
+        
+        # Test history changes are appended to a journal and folded into the snapshot periodically
+        self._history_seq = 0  # Sequence number of the last journal entry
+        self._history_log_lines = 0  # Journal entries not yet folded into the snapshot
+        self._history_lock = threading.RLock()  # Guards the sequence numbers, journal and snapshot
+        self.history_compact_every = 500
         self.test_history = self._load_test_history()
         
+        # Knowledge base saves are batched: written every kb_flush_every saves or kb_flush_interval seconds
+        self._kb_dirty = False
+        self._kb_pending = 0
+        self._kb_last_flush = time.monotonic()
+        self.kb_flush_every = 10
+        self.kb_flush_interval = 30.0
+        atexit.register(self.flush)
+        
+        # Bumped on every test history change so readers can cache derived data
+        self.test_history_version = 0
+        
+        # Callbacks notified with (test_id, result) whenever a test result is saved
+        self._result_listeners = []
+        
         self.logger.info("Memory manager initialized")
     
     def ensure_memory_dirs(self):
@@ -42,33 +67,95 @@ class MemoryManager:
         kb_path = os.path.join(self.memory_dir, "knowledge", "knowledge_base.json")
         if os.path.exists(kb_path):
             try:
-                with open(kb_path, 'r') as f:
-                    return json.load(f)
+                with open(kb_path, 'rb') as f:
+                    return json_utils.loads(f.read())
             except Exception as e:
                 self.logger.error(f"Error loading knowledge base: {e}")
+                self._set_aside_unreadable(kb_path)
                 return {"concepts": {}, "rules": [], "examples": []}
         else:
             return {"concepts": {}, "rules": [], "examples": []}
     
     def _load_test_history(self):
-        """Load the test history from disk"""
+        """Load the test history snapshot from disk and replay the journal on top of it"""
         history_path = os.path.join(self.memory_dir, "tests", "test_history.json")
+        data = {"tests": [], "results": {}, "fixed_tests": {}}
         if os.path.exists(history_path):
             try:
-                with open(history_path, 'r') as f:
-                    data = json.load(f)
+                with open(history_path, 'rb') as f:
+                    data = json_utils.loads(f.read())
                     if "fixed_tests" not in data:
                         data["fixed_tests"] = {}
-                    return data
             except Exception as e:
                 self.logger.error(f"Error loading test history: {e}")
-                return {"tests": [], "results": {}, "fixed_tests": {}}
-        else:
-            return {"tests": [], "results": {}, "fixed_tests": {}}
+                self._set_aside_unreadable(history_path)
+                data = {"tests": [], "results": {}, "fixed_tests": {}}
+        
+        self._history_seq = data.get("journal_seq", 0)
+        self._replay_test_history_log(data)
+        return data
+    
+    def _set_aside_unreadable(self, path):
+        """Move a file that failed to load out of the way so the next save can't overwrite it"""
+        aside_path = f"{path}.unreadable_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        try:
+            os.replace(path, aside_path)
+            self.logger.warning(f"Moved unreadable {path} to {aside_path}")
+        except OSError as e:
+            self.logger.error(f"Error moving unreadable {path} aside: {e}")
+    
+    def _replay_test_history_log(self, data):
+        """Apply journal entries newer than the snapshot to the loaded test history"""
+        log_path = os.path.join(self.memory_dir, "tests", "test_history.log")
+        if not os.path.exists(log_path):
+            return
+        
+        snapshot_seq = self._history_seq
+        try:
+            line = "\n"
+            with open(log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json_utils.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from an interrupted append
+                    self._history_log_lines += 1
+                    if entry.get("seq", 0) <= snapshot_seq:
+                        continue  # Already folded into the snapshot
+                    self._history_seq = entry["seq"]
+                    self._apply_history_entry(data, entry)
+            if not line.endswith("\n"):
+                # End the torn line so the next append starts on a line of its own
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    f.write("\n")
+        except Exception as e:
+            self.logger.error(f"Error replaying test history journal: {e}")
+    
+    def _apply_history_entry(self, data, entry):
+        """Apply one journal entry to a test history dict"""
+        op = entry.get("op")
+        if op == "test":
+            test = entry["data"]
+            tests = data["tests"]
+            if test["id"] < len(tests):
+                tests[test["id"]] = test
+            else:
+                tests.append(test)
+        elif op == "result":
+            data["results"].setdefault(str(entry["test_id"]), []).append(entry["data"])
+        elif op == "update":
+            if entry["test_id"] < len(data["tests"]):
+                data["tests"][entry["test_id"]].update(entry["data"])
+        elif op == "fixed":
+            data.setdefault("fixed_tests", {})[str(entry["old_id"])] = entry["new_id"]
     
     def log_agent_action(self, action_log):
         """Log an agent action"""
-        self.action_logs.append(action_log)
+        self.log_agent_actions([action_log])
+    
+    def log_agent_actions(self, action_logs):
+        """Log a batch of agent actions"""
+        self.action_logs.extend(action_logs)
         
         # Save to disk periodically (every 10 actions)
         if len(self.action_logs) >= 10:
@@ -79,72 +166,177 @@ class MemoryManager:
         if not self.action_logs:
             return
             
-        timestamp = int(time.time())
-        log_path = os.path.join(self.memory_dir, "actions", f"actions_{timestamp}.json")
+        # Appended to a single NDJSON file (one action per line), rolled over once it gets large
+        log_path = os.path.join(self.memory_dir, "actions", "actions.ndjson")
         
         try:
-            with open(log_path, 'w') as f:
-                json.dump(self.action_logs, f, indent=2)
+            lines = [json_utils.dumps(action_log).encode("utf-8") + b"\n" for action_log in self.action_logs]
+            fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                self._write_buffers(fd, lines)
+                size = os.fstat(fd).st_size
+            finally:
+                os.close(fd)
             self.logger.debug(f"Saved {len(self.action_logs)} action logs to {log_path}")
             self.action_logs = []
+            
+            if size >= self.action_log_max_bytes:
+                rolled_path = os.path.join(self.memory_dir, "actions", f"actions_{int(time.time())}.ndjson")
+                os.replace(log_path, rolled_path)
         except Exception as e:
             self.logger.error(f"Error saving action logs: {e}")
     
+    def _write_buffers(self, fd, buffers):
+        """Write a list of byte strings to fd, with a single writev() where the platform has it"""
+        if hasattr(os, "writev") and len(buffers) <= 1024:
+            written = os.writev(fd, buffers)
+            data = memoryview(b"".join(buffers))[written:] if written < sum(map(len, buffers)) else None
+        else:
+            data = memoryview(b"".join(buffers))
+        while data:
+            data = data[os.write(fd, data):]
+    
     def save_knowledge(self, concept, data):
         """Save a piece of knowledge to the knowledge base"""
         self.knowledge_base["concepts"][concept] = data
-        self._save_knowledge_base()
+        self._kb_dirty = True
+        self._kb_pending += 1
+        self._maybe_flush_kb()
         
         self.logger.info(f"Saved knowledge: {concept}")
         return True
     
+    def save_knowledge_many(self, items):
+        """Save several {concept: data} entries to the knowledge base with a single write"""
+        if not items:
+            return True
+        self.knowledge_base["concepts"].update(items)
+        self._kb_dirty = True
+        self._kb_pending += len(items)
+        self._maybe_flush_kb()
+        
+        self.logger.info(f"Saved knowledge: {', '.join(items)}")
+        return True
+    
     def get_knowledge(self, concept=None):
         """Retrieve knowledge from the knowledge base"""
         if concept:
             return self.knowledge_base["concepts"].get(concept, None)
         return self.knowledge_base
     
+    def _maybe_flush_kb(self):
+        """Write the knowledge base if enough saves are pending or the flush interval has passed"""
+        if self._kb_pending >= self.kb_flush_every or time.monotonic() - self._kb_last_flush > self.kb_flush_interval:
+            self._save_knowledge_base()
+    
+    def flush(self):
+        """Write any knowledge base changes and action logs that are still pending"""
+        if self._kb_dirty:
+            self._save_knowledge_base()
+        self._save_action_logs()
+    
     def _save_knowledge_base(self):
         """Save the knowledge base to disk"""
         kb_path = os.path.join(self.memory_dir, "knowledge", "knowledge_base.json")
+        self._kb_dirty = False
+        self._kb_pending = 0
+        self._kb_last_flush = time.monotonic()
         try:
-            with open(kb_path, 'w') as f:
-                json.dump(self.knowledge_base, f, indent=2)
+            self._write_file_atomic(kb_path, json_utils.dumps(self.knowledge_base, indent=True))
             self.logger.debug("Saved knowledge base")
             return True
         except Exception as e:
+            self._kb_dirty = True  # Retry on the next flush
             self.logger.error(f"Error saving knowledge base: {e}")
             return False
     
+    def _write_file_atomic(self, path, text, durable=True):
+        """Replace path with text in one write to a temp file followed by os.replace
+        
+        Readers never see a half-written file; durable also fsyncs before the rename.
+        """
+        # A unique temp file per write, so concurrent saves of the same path can't clobber each other
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + ".", suffix=".tmp")
+        data = memoryview(text.encode("utf-8"))
+        try:
+            try:
+                if hasattr(os, "fchmod"):  # Not on Windows before Python 3.13
+                    os.fchmod(fd, 0o644)
+                while data:
+                    data = data[os.write(fd, data):]
+                if durable:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     def save_test(self, test_data):
         """Save a test to the test history"""
-        test_id = len(self.test_history["tests"])
-        test_data["id"] = test_id
-        test_data["created"] = time.time()
-        
-        self.test_history["tests"].append(test_data)
-        self._save_test_history()
+        return self.save_tests([test_data])[0]
+    
+    def save_tests(self, tests):
+        """Save a batch of tests to the test history with a single write"""
+        created = time.time()
+        with self._history_lock:  # IDs are list positions, so assign them under the journal lock
+            first_id = len(self.test_history["tests"])
+            for offset, test_data in enumerate(tests):
+                test_data["id"] = first_id + offset
+                test_data["created"] = created
+                
+            if tests:
+                self._append_test_history([{"op": "test", "data": test_data} for test_data in tests])
         
-        return test_id
+        return [test_data["id"] for test_data in tests]
     
     def save_test_result(self, test_id, result):
         """Save a test result to the test history"""
-        if str(test_id) not in self.test_history["results"]:
-            self.test_history["results"][str(test_id)] = []
+        return self.save_test_results([(test_id, result)])
+    
+    def save_test_results(self, results):
+        """Save a batch of (test_id, result) pairs to the test history with a single write"""
+        for test_id, result in results:
+            result["timestamp"] = time.time()
+            if "traceback" in result and not isinstance(result["traceback"], str):
+                result["traceback"] = str(result["traceback"])  # Lazily formatted tracebacks
             
-        result["timestamp"] = time.time()
-        self.test_history["results"][str(test_id)].append(result)
-        self._save_test_history()
+        if results and not self._append_test_history(
+                [{"op": "result", "test_id": test_id, "data": result} for test_id, result in results]):
+            return False
+        for test_id, result in results:
+            self._notify_result_listeners(test_id, result)
 
         return True
 
+    def get_average_duration(self, test_id, window=5):
+        """Return the mean execution time of a test's recent results, or None if it never ran"""
+        times = [r["execution_time"] for r in self.test_history["results"].get(str(test_id), ())[-window:]
+                 if isinstance(r.get("execution_time"), (int, float))]
+        return sum(times) / len(times) if times else None
+
+    def add_result_listener(self, callback):
+        """Register a callback invoked with (test_id, result) for each saved test result"""
+        if callback not in self._result_listeners:
+            self._result_listeners.append(callback)
+
+    def _notify_result_listeners(self, test_id, result):
+        """Notify registered listeners about a saved test result"""
+        for callback in self._result_listeners:
+            try:
+                callback(test_id, result)
+            except Exception as e:
+                self.logger.error(f"Error in test result listener: {e}")
+
     def update_test(self, test_id, updates):
         """Update an existing test entry with new data"""
         try:
             if test_id < len(self.test_history["tests"]):
-                self.test_history["tests"][test_id].update(updates)
-                self._save_test_history()
-                return True
+                return self._append_test_history([{"op": "update", "test_id": test_id, "data": updates}])
         except Exception as e:
             self.logger.error(f"Error updating test {test_id}: {e}")
         return False
@@ -152,28 +344,65 @@ class MemoryManager:
     def record_fixed_test(self, old_id, new_id):
         """Record that a test has been replaced by a fixed version"""
         try:
-            if "fixed_tests" not in self.test_history:
-                self.test_history["fixed_tests"] = {}
-            self.test_history["fixed_tests"][str(old_id)] = new_id
-            self._save_test_history()
-            return True
+            return self._append_test_history([{"op": "fixed", "old_id": old_id, "new_id": new_id}])
         except Exception as e:
             self.logger.error(f"Error recording fixed test mapping: {e}")
         return False
     
-    def _save_test_history(self):
-        """Save the test history to disk"""
-        history_path = os.path.join(self.memory_dir, "tests", "test_history.json")
-        try:
-            if "fixed_tests" not in self.test_history:
-                self.test_history["fixed_tests"] = {}
-            with open(history_path, 'w') as f:
-                json.dump(self.test_history, f, indent=2)
-            self.logger.debug("Saved test history")
+    def _append_test_history(self, entries):
+        """Apply test history changes and append them to the journal, compacting it once it grows long
+        
+        Returns False, leaving the history untouched, if the changes can't be serialized.
+        """
+        with self._history_lock:
+            log_path = os.path.join(self.memory_dir, "tests", "test_history.log")
+            try:
+                # Values JSON can't represent (sets, bytes, objects returned by tests) are stored as their repr
+                lines = []
+                for seq, entry in enumerate(entries, self._history_seq + 1):
+                    entry["seq"] = seq
+                    lines.append(json_utils.dumps(entry, default=repr) + "\n")
+            except Exception as e:
+                self.logger.error(f"Error serializing test history changes: {e}")
+                return False
+        
+            self._history_seq += len(entries)
+            for entry in entries:
+                self._apply_history_entry(self.test_history, entry)
+            self.test_history_version += 1
+            try:
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    f.write("".join(lines))
+            except Exception as e:
+                self.logger.error(f"Error appending to test history journal: {e}")
+                self._compact_test_history()
+                return True
+        
+            self._history_log_lines += len(lines)
+            if self._history_log_lines >= self.history_compact_every:
+                self._compact_test_history()
             return True
-        except Exception as e:
-            self.logger.error(f"Error saving test history: {e}")
-            return False
+    
+    def _compact_test_history(self):
+        """Write a full test history snapshot to disk and truncate the journal"""
+        with self._history_lock:
+            history_path = os.path.join(self.memory_dir, "tests", "test_history.json")
+            log_path = os.path.join(self.memory_dir, "tests", "test_history.log")
+            self.test_history_version += 1
+            try:
+                if "fixed_tests" not in self.test_history:
+                    self.test_history["fixed_tests"] = {}
+                # The snapshot records the last journal entry it contains, so a crash before
+                # the truncate below cannot replay entries twice
+                self.test_history["journal_seq"] = self._history_seq
+                self._write_file_atomic(history_path, json_utils.dumps(self.test_history, indent=True, default=repr))
+                open(log_path, 'w').close()
+                self._history_log_lines = 0
+                self.logger.debug("Saved test history")
+                return True
+            except Exception as e:
+                self.logger.error(f"Error saving test history: {e}")
+                return False
     
     def save_cycle_results(self, cycle_number, results):
         """Save results from a complete system cycle"""
@@ -183,8 +412,7 @@ class MemoryManager:
         results["cycle"] = cycle_number
         
         try:
-            with open(cycle_path, 'w') as f:
-                json.dump(results, f, indent=2)
+            self._write_file_atomic(cycle_path, json_utils.dumps(results, indent=True), durable=False)
             self.logger.info(f"Saved results for cycle {cycle_number}")
             return True
         except Exception as e:
@@ -216,7 +444,7 @@ class MemoryManager:
             # Ensure all logs are saved
             self._save_action_logs()
             self._save_knowledge_base()
-            self._save_test_history()
+            self._compact_test_history()
             
             # Create the backup directory
             os.makedirs(backup_dir, exist_ok=True)
@@ -263,7 +491,7 @@ class MemoryManager:
 
             # Save cleared structures
             self._save_knowledge_base()
-            self._save_test_history()
+            self._compact_test_history()
 
             # Reset system state counters
             state_path = os.path.join(self.memory_dir, "system_state.json")
@@ -276,8 +504,7 @@ class MemoryManager:
                 "total_fixes_attempted": 0,
                 "total_fixes_succeeded": 0,
             }
-            with open(state_path, "w") as f:
-                json.dump(state, f, indent=2)
+            self._write_file_atomic(state_path, json_utils.dumps(state, indent=True))
 
             self.logger.info("Training data reset")
             return True
@@ -0,0 +1,93 @@
+import unittest
+
+from core.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+class CircuitBreakerTest(unittest.TestCase):
+    def setUp(self):
+        self.transitions = []
+        self.breaker = CircuitBreaker("agent", failure_threshold=3, success_threshold=2, reset_timeout=10,
+                                      half_open_limit=1, on_state_change=self._on_state_change)
+
+    def _on_state_change(self, breaker, old_state, new_state):
+        self.transitions.append((old_state, new_state))
+
+    def _trip(self, now=0):
+        for _ in range(self.breaker.failure_threshold):
+            tripped = self.breaker.on_failure(now=now)
+        return tripped
+
+    def test_trips_after_failure_threshold(self):
+        self.assertFalse(self.breaker.on_failure(now=0))
+        self.assertFalse(self.breaker.on_failure(now=0))
+        self.assertTrue(self.breaker.on_failure(now=0))
+
+        self.assertTrue(self.breaker.open)
+        self.assertFalse(self.breaker.can_execute(now=1))
+        self.assertEqual(self.transitions, [(CLOSED, OPEN)])
+
+    def test_success_resets_failure_count_while_closed(self):
+        self.breaker.on_failure(now=0)
+        self.breaker.on_failure(now=0)
+        self.breaker.on_success()
+        self.breaker.on_failure(now=0)
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertEqual(self.transitions, [])
+
+    def test_reset_timeout_moves_to_half_open(self):
+        self._trip(now=0)
+
+        self.assertFalse(self.breaker.can_execute(now=9.9))
+        self.assertTrue(self.breaker.can_execute(now=10))
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertEqual(self.transitions, [(CLOSED, OPEN), (OPEN, HALF_OPEN)])
+
+    def test_half_open_admits_limited_probes(self):
+        self._trip(now=0)
+
+        self.assertTrue(self.breaker.can_execute(now=10))
+        self.assertFalse(self.breaker.can_execute(now=10))  # The one probe is still in flight
+
+        self.breaker.on_success()
+        self.assertEqual(self.breaker.state, HALF_OPEN)  # One success of the two needed
+        self.assertTrue(self.breaker.can_execute(now=11))
+        self.breaker.on_success()
+
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.assertTrue(self.breaker.can_execute(now=12))
+        self.assertEqual(self.transitions, [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)])
+
+    def test_probe_failure_reopens_with_fresh_timeout(self):
+        self._trip(now=0)
+        self.assertTrue(self.breaker.can_execute(now=10))
+
+        self.assertTrue(self.breaker.on_failure(now=15))
+
+        self.assertTrue(self.breaker.open)
+        self.assertFalse(self.breaker.can_execute(now=24))
+        self.assertTrue(self.breaker.can_execute(now=25))
+        self.assertEqual(self.transitions,
+                         [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, OPEN), (OPEN, HALF_OPEN)])
+
+    def test_callback_counts_open_breakers(self):
+        open_count = 0
+
+        def on_state_change(breaker, old_state, new_state):
+            nonlocal open_count
+            open_count += (new_state == OPEN) - (old_state == OPEN)
+
+        breakers = [CircuitBreaker(name, failure_threshold=1, reset_timeout=10, on_state_change=on_state_change)
+                    for name in ("tester", "fixer")]
+        for breaker in breakers:
+            breaker.on_failure(now=0)
+            breaker.on_failure(now=0)  # Failing again while open must not count twice
+        self.assertEqual(open_count, 2)
+
+        breakers[0].can_execute(now=10)
+        self.assertEqual(open_count, 1)
+        breakers[1].force_close()
+        breakers[1].force_close()
+        self.assertEqual(open_count, 0)
+
+if __name__ == "__main__":
+    unittest.main()
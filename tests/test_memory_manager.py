@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import memory.memory_manager as memory_manager
+
+class TestHistoryJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        # MemoryManager keeps its files in <package>/memory, next to its module
+        patcher = mock.patch.object(memory_manager, "__file__", os.path.join(self.root, "memory", "memory_manager.py"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.log_path = os.path.join(self.root, "memory", "tests", "test_history.log")
+        self.snapshot_path = os.path.join(self.root, "memory", "tests", "test_history.json")
+
+    def _manager(self):
+        return memory_manager.MemoryManager({})
+
+    def _record_history(self, manager):
+        ids = manager.save_tests([{"name": "add"}, {"name": "concat"}])
+        manager.save_test_results([(ids[0], {"passed": False}), (ids[1], {"passed": True})])
+        new_id = manager.save_test({"name": "add (fixed)"})
+        manager.update_test(ids[0], {"replaced_by": new_id, "fixed": True})
+        manager.record_fixed_test(ids[0], new_id)
+
+    def _summary(self, history):
+        return (
+            [(test["id"], test["name"], test.get("replaced_by")) for test in history["tests"]],
+            {test_id: [r["passed"] for r in results] for test_id, results in history["results"].items()},
+            history["fixed_tests"],
+        )
+
+    def test_reload_replays_journal(self):
+        manager = self._manager()
+        self._record_history(manager)
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+        reloaded = self._manager()
+
+        self.assertEqual(self._summary(reloaded.test_history), self._summary(manager.test_history))
+        self.assertEqual(self._summary(reloaded.test_history), (
+            [(0, "add", 2), (1, "concat", None), (2, "add (fixed)", None)],
+            {"0": [False], "1": [True]},
+            {"0": 2},
+        ))
+
+    def test_crash_between_snapshot_and_truncate_does_not_replay_twice(self):
+        manager = self._manager()
+        self._record_history(manager)
+        with open(self.log_path, encoding="utf-8") as f:
+            journal = f.read()
+
+        # Snapshot written, then the process dies before the journal is truncated
+        manager._compact_test_history()
+        with open(self.log_path, "w", encoding="utf-8") as f:
+            f.write(journal)
+
+        reloaded = self._manager()
+
+        self.assertEqual(self._summary(reloaded.test_history), self._summary(manager.test_history))
+
+    def test_unreadable_journal_lines_are_skipped(self):
+        manager = self._manager()
+        self._record_history(manager)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write('{"op": "result", "test_id": 1, "da')  # Torn by an interrupted append
+
+        reloaded = self._manager()
+
+        self.assertEqual(self._summary(reloaded.test_history), self._summary(manager.test_history))
+
+        # Appends after the torn line still replay on the next load
+        reloaded.save_test_result(1, {"passed": False})
+        self.assertEqual([r["passed"] for r in self._manager().test_history["results"]["1"]], [True, False])
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        manager = self._manager()
+        manager.history_compact_every = 3
+        self._record_history(manager)
+
+        self.assertTrue(os.path.exists(self.snapshot_path))
+        with open(self.log_path, encoding="utf-8") as f:
+            self.assertLess(len(f.readlines()), manager.history_compact_every)
+
+        reloaded = self._manager()
+        self.assertEqual(self._summary(reloaded.test_history), self._summary(manager.test_history))
+
+        # Sequence numbers carry on from the snapshot
+        reloaded.save_test({"name": "later"})
+        self.assertEqual([test["name"] for test in self._manager().test_history["tests"]],
+                         ["add", "concat", "add (fixed)", "later"])
+
+if __name__ == "__main__":
+    unittest.main()
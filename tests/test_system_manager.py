@@ -0,0 +1,94 @@
+import logging
+import threading
+import unittest
+from collections import Counter
+
+from core.circuit_breaker import CircuitBreaker
+from core.system_manager import SystemManager
+
+class _Memory:
+    """Just the parts of MemoryManager the fix cache touches"""
+    def __init__(self, tests):
+        self.test_history = {"tests": tests, "results": {}, "fixed_tests": {}}
+        self.knowledge = {}
+
+    def save_knowledge(self, concept, data):
+        self.knowledge[concept] = data
+        return True
+
+def _make_manager(tests):
+    # Only the fix-cache state is set up; no agents or threads are started
+    manager = SystemManager.__new__(SystemManager)
+    manager.logger = logging.getLogger(__name__)
+    manager.memory = _Memory(tests)
+    manager.recovery_strategies = {}
+    manager._fix_cache = {}
+    manager._recovery_by_mode = {}
+    manager.failure_mode_counts = Counter()
+    manager.recovery_mode_threshold = 3
+    return manager
+
+class FixCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = _make_manager([
+            {"id": 0, "name": "add", "code": "def test_add():\n    return 1 + 1"},
+            {"id": 1, "name": "concat", "code": "def test_concat():\n    return 'a' + 'b'"},
+        ])
+        self.failure = "Test failed: output mismatch"
+
+    def test_same_failure_in_another_test_does_not_share_fix(self):
+        fix = {"test_id": 0, "success": True, "fix_type": "code_change", "fixed_code": "def test_add():\n    return 2"}
+        self.manager._record_successful_fix(self.failure, fix)
+
+        hits, remainder = self.manager._match_recovery([{"test_id": 1, "passed": False, "failure_reason": self.failure}])
+
+        self.assertEqual(hits, [])
+        self.assertEqual(len(remainder), 1)
+
+    def test_same_failure_in_same_test_reuses_fix(self):
+        fix = {"test_id": 0, "success": True, "fix_type": "code_change", "fixed_code": "def test_add():\n    return 2"}
+        self.manager._record_successful_fix(self.failure, fix)
+
+        result = {"test_id": 0, "passed": False, "failure_reason": self.failure}
+        hits, remainder = self.manager._match_recovery([result])
+
+        self.assertEqual(hits, [(result, fix, "exact")])
+        self.assertEqual(remainder, [])
+
+    def test_recurring_failure_mode_only_reuses_fix_of_same_test(self):
+        fix = {"test_id": 0, "success": True, "fix_type": "code_change", "fixed_code": "def test_add():\n    return 2"}
+        self.manager._record_successful_fix("AssertionError: expected 3", fix)
+
+        for attempt in range(self.manager.recovery_mode_threshold):
+            other = {"test_id": 1, "passed": False, "failure_reason": f"AssertionError: expected {attempt + 10}"}
+            hits, _ = self.manager._match_recovery([other])
+            self.assertEqual(hits, [])
+
+        same = {"test_id": 0, "passed": False, "failure_reason": "AssertionError: expected 4"}
+        hits, _ = self.manager._match_recovery([same])
+        self.assertEqual(hits, [(same, fix, "mode")])
+
+class OpenBreakerCountTest(unittest.TestCase):
+    def test_open_breaker_count_follows_transitions(self):
+        manager = _make_manager([])
+        manager._open_breaker_count = 0
+        manager._breaker_count_lock = threading.Lock()
+        breakers = [CircuitBreaker(name, failure_threshold=2, reset_timeout=10,
+                                   on_state_change=manager._on_breaker_state_change)
+                    for name in ("Tester", "Fixer")]
+
+        for breaker in breakers:
+            for _ in range(3):
+                breaker.on_failure(now=0)
+        self.assertEqual(manager._open_breaker_count, 2)
+
+        # Half-open probe fails and re-opens, then the other breaker is reset
+        self.assertTrue(breakers[0].can_execute(now=10))
+        self.assertEqual(manager._open_breaker_count, 1)
+        breakers[0].on_failure(now=10)
+        self.assertEqual(manager._open_breaker_count, 2)
+        breakers[1].force_close()
+        self.assertEqual(manager._open_breaker_count, 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,15 @@
+import unittest
+
+from agents.test_generator import _syntax_error
+
+class SyntaxCheckTest(unittest.TestCase):
+    def test_valid_code_passes(self):
+        self.assertIsNone(_syntax_error("def test_function(value):\n    return value * 2"))
+
+    def test_code_rejected_only_by_the_compiler_fails(self):
+        for code in ("return value * 2", "break", "await value", "x = 1\nglobal x"):
+            with self.subTest(code=code):
+                self.assertIsNotNone(_syntax_error(code))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import time
+import unittest
+
+from agents.tester import Tester
+
+def _pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+class _Memory:
+    """Just the parts of MemoryManager the tester touches"""
+    def __init__(self):
+        self.results = []
+
+    def get_average_duration(self, test_id, window=5):
+        return None
+
+    def log_agent_action(self, action_log):
+        pass
+
+    def save_test_results(self, results):
+        self.results.extend(results)
+        return True
+
+    def save_knowledge(self, concept, data):
+        return True
+
+class TesterScheduleTest(unittest.TestCase):
+    def test_malformed_timeouts_still_sort(self):
+        tester = Tester(None, _Memory(), None)
+        tests = [
+            {"id": 0, "timeout_seconds": "45"},
+            {"id": 1, "timeout_seconds": None},
+            {"id": 2, "timeout_seconds": "soon"},
+            {"id": 3, "timeout_seconds": 60},
+        ]
+
+        ordered = sorted(tests, key=tester._estimate_duration, reverse=True)
+
+        self.assertEqual([test["id"] for test in ordered], [3, 0, 1, 2])
+
+class TesterTimeoutTest(unittest.TestCase):
+    def test_queued_test_timeout_starts_when_it_runs(self):
+        tester = Tester(None, _Memory(), None)
+        tester.max_workers = 1
+        tests = [
+            {"id": 0, "type": "function", "timeout_seconds": 20, "inputs": {}, "success_criteria": "output == 1",
+             "code": "def main():\n    import time\n    time.sleep(3)\n    return 1"},
+            {"id": 1, "type": "function", "timeout_seconds": 1, "inputs": {}, "success_criteria": "output == 2",
+             "code": "def main():\n    return 2"},
+        ]
+        try:
+            results = tester.run_tests(tests)
+        finally:
+            tester.shutdown()
+
+        # The second test waits behind the first on the single worker without timing out
+        self.assertEqual([result["passed"] for result in results], [True, True])
+
+class TesterShutdownTest(unittest.TestCase):
+    def test_shutdown_kills_hung_test_worker(self):
+        tester = Tester(None, None, None)
+        future = tester._submit_test({"id": "hang", "type": "function", "code": "import time\ntime.sleep(60)"})
+
+        # Wait for a worker to pick the test up
+        deadline = time.monotonic() + 30
+        while not future.running() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self.assertTrue(future.running())
+        pids = [process.pid for process in tester._proc_pool._processes.values()]
+        self.assertTrue(pids)
+
+        tester.shutdown()
+
+        self.assertIsNone(tester._proc_pool)
+        for pid in pids:
+            self.assertFalse(_pid_exists(pid), f"worker {pid} still running after shutdown()")
+
+if __name__ == "__main__":
+    unittest.main()
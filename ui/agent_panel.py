@@ -4,6 +4,8 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
 from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QFont
 
+from utils import json_utils
+
 class AgentPanel(QGroupBox):
     def __init__(self, agent):
         super().__init__(agent.name)
@@ -11,6 +13,10 @@ class AgentPanel(QGroupBox):
         self.agent = agent
         self.logger = logging.getLogger(__name__)
         
+        # Last values shown, so unchanged polls skip setText (and the label re-layout)
+        self._last_status_key = None
+        self._last_stats_key = None
+        
         # Set up the layout
         self.main_layout = QVBoxLayout(self)
         
@@ -69,14 +75,19 @@ class AgentPanel(QGroupBox):
         """Update the status display with current agent status"""
         try:
             agent_status = status.get("status", "unknown")
-            self.status_label.setText(f"Status: {agent_status}")
-            
-            # Update last action time
             last_action = status.get("last_action", 0)
-            if last_action > 0:
-                self.action_time_label.setText(f"Last action: {last_action:.1f}s ago")
-            else:
-                self.action_time_label.setText("Last action: Never")
+            
+            # Only touch the labels when the status or the displayed time (0.1s buckets) changed
+            status_key = (agent_status, round(last_action, 1))
+            if status_key != self._last_status_key:
+                self._last_status_key = status_key
+                self.status_label.setText(f"Status: {agent_status}")
+                
+                # Update last action time
+                if last_action > 0:
+                    self.action_time_label.setText(f"Last action: {last_action:.1f}s ago")
+                else:
+                    self.action_time_label.setText("Last action: Never")
             
             # Update stats based on agent type
             self.update_agent_stats()
@@ -87,43 +98,68 @@ class AgentPanel(QGroupBox):
     def update_agent_stats(self):
         """Update the agent-specific statistics"""
         try:
-            agent_name = self.agent.name
-            stats_text = ""
+            agent = self.agent
+            agent_name = agent.name
             
+            # Read the values this agent type shows; skip formatting if none changed
             if agent_name == "TestGenerator":
-                stats_text = f"Tests Generated: {self.agent.tests_generated}\n"
-                stats_text += f"Current Complexity: {self.agent.current_complexity}\n"
-                stats_text += f"Success Rate: {self.agent.success_rate:.1%}"
+                key = (agent.tests_generated, agent.current_complexity, agent.success_rate)
+            elif agent_name == "Tester":
+                key = (agent.tests_run, agent.tests_passed, agent.tests_failed)
+            elif agent_name == "Fixer":
+                key = (agent.fixes_attempted, agent.fixes_successful)
+            elif agent_name == "Learner":
+                key = (agent.learning_sessions, agent.concepts_learned, agent.rules_discovered)
+            elif agent_name == "Monitor":
+                key = (agent.checks_performed, agent.alerts_raised, self.format_uptime(agent.system_uptime))
+            elif agent_name == "UserInterface":
+                key = (agent.interactions, agent.pending_requests.qsize())
+            else:
+                return
+            
+            if key == self._last_stats_key:
+                return
+            self._last_stats_key = key
+            
+            if agent_name == "TestGenerator":
+                tests_generated, current_complexity, success_rate = key
+                stats_text = f"Tests Generated: {tests_generated}\n"
+                stats_text += f"Current Complexity: {current_complexity}\n"
+                stats_text += f"Success Rate: {success_rate:.1%}"
                 
             elif agent_name == "Tester":
-                stats_text = f"Tests Run: {self.agent.tests_run}\n"
-                stats_text += f"Tests Passed: {self.agent.tests_passed}\n"
-                stats_text += f"Tests Failed: {self.agent.tests_failed}"
+                tests_run, tests_passed, tests_failed = key
+                stats_text = f"Tests Run: {tests_run}\n"
+                stats_text += f"Tests Passed: {tests_passed}\n"
+                stats_text += f"Tests Failed: {tests_failed}"
                 
             elif agent_name == "Fixer":
-                stats_text = f"Fixes Attempted: {self.agent.fixes_attempted}\n"
-                stats_text += f"Fixes Successful: {self.agent.fixes_successful}\n"
+                fixes_attempted, fixes_successful = key
+                stats_text = f"Fixes Attempted: {fixes_attempted}\n"
+                stats_text += f"Fixes Successful: {fixes_successful}\n"
                 
-                if self.agent.fixes_attempted > 0:
-                    success_rate = self.agent.fixes_successful / self.agent.fixes_attempted
+                if fixes_attempted > 0:
+                    success_rate = fixes_successful / fixes_attempted
                     stats_text += f"Success Rate: {success_rate:.1%}"
                 
             elif agent_name == "Learner":
-                stats_text = f"Learning Sessions: {self.agent.learning_sessions}\n"
-                stats_text += f"Concepts Learned: {self.agent.concepts_learned}\n"
-                stats_text += f"Rules Discovered: {self.agent.rules_discovered}"
+                learning_sessions, concepts_learned, rules_discovered = key
+                stats_text = f"Learning Sessions: {learning_sessions}\n"
+                stats_text += f"Concepts Learned: {concepts_learned}\n"
+                stats_text += f"Rules Discovered: {rules_discovered}"
                 
             elif agent_name == "Monitor":
-                stats_text = f"Checks Performed: {self.agent.checks_performed}\n"
-                stats_text += f"Alerts Raised: {self.agent.alerts_raised}\n"
-                stats_text += f"System Uptime: {self.format_uptime(self.agent.system_uptime)}"
+                checks_performed, alerts_raised, uptime = key
+                stats_text = f"Checks Performed: {checks_performed}\n"
+                stats_text += f"Alerts Raised: {alerts_raised}\n"
+                stats_text += f"System Uptime: {uptime}"
                 
-            elif agent_name == "UserInterface":
-                stats_text = f"User Interactions: {self.agent.interactions}\n"
-                stats_text += f"Pending Requests: {self.agent.pending_requests.qsize()}"
+            else:
+                interactions, pending = key
+                stats_text = f"User Interactions: {interactions}\n"
+                stats_text += f"Pending Requests: {pending}"
             
-            if stats_text:
-                self.stats_label.setText(stats_text)
+            self.stats_label.setText(stats_text)
             
         except Exception as e:
             self.logger.error(f"Error updating agent stats: {e}")
@@ -182,8 +218,7 @@ class AgentPanel(QGroupBox):
             # Add agent-specific details
             if hasattr(self.agent, 'get_detailed_status'):
                 agent_details = self.agent.get_detailed_status()
-                import json
-                details += json.dumps(agent_details, indent=2)
+                details += json_utils.dumps(agent_details, indent=True)
             else:
                 # Get all readable attributes
                 details += "Attributes:\n"
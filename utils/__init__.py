@@ -1,4 +1,5 @@
 from utils.config import load_config, save_config
 from utils.logger import setup_logger
+from utils import json_utils
 
-__all__ = ['load_config', 'save_config', 'setup_logger'] 
\ No newline at end of file
+__all__ = ['load_config', 'save_config', 'setup_logger', 'json_utils'] 
\ No newline at end of file
@@ -0,0 +1,35 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library
+    orjson = None
+
+# Raised by loads() for invalid JSON (orjson's error subclasses this one)
+JSONDecodeError = json.JSONDecodeError
+
+def loads(data):
+    """Parse a JSON document from str or bytes"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity written by json.dump; let the stdlib handle it
+    return json.loads(data)
+
+def dumps(obj, indent=False, sort_keys=False, default=None):
+    """Serialize obj to a JSON string, indented by 2 spaces if indent is set
+
+    default, if given, is called to convert objects that can't be serialized otherwise.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except TypeError:
+            pass  # e.g. integers wider than 64 bits; let the stdlib handle it
+    return json.dumps(obj, indent=2 if indent else None, sort_keys=sort_keys, default=default)